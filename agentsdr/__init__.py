@@ -1,5 +1,5 @@
 import os
-from flask import Flask
+from flask import Flask, g
 from flask_login import LoginManager
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -22,6 +22,14 @@ def create_app(config_name=None):
     login_manager.init_app(app)
     limiter.init_app(app)
     csrf.init_app(app)
+
+    # Server-side sessions keep OAuth tokens out of the cookie; only
+    # enabled when SESSION_TYPE is configured (e.g. 'redis' in production)
+    if app.config.get('SESSION_TYPE') == 'redis':
+        import redis
+        from flask_session import Session
+        app.config['SESSION_REDIS'] = redis.Redis.from_url(app.config['SESSION_REDIS_URL'])
+        Session(app)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
@@ -43,6 +51,19 @@ def create_app(config_name=None):
     from agentsdr.main import main_bp
     app.register_blueprint(main_bp)
 
+    # Eagerly build shared service singletons so misconfiguration surfaces
+    # at boot instead of on a user's first email, and the first request
+    # path is a plain attribute read
+    with app.app_context():
+        from agentsdr.core.email import EmailService
+        from agentsdr.core.supabase_client import supabase
+
+        app.email_service = EmailService()
+        try:
+            supabase.get_service_client()  # warm the stateless admin client
+        except Exception as e:
+            app.logger.warning(f"Could not warm Supabase service client: {e}")
+
     # Exempt JSON API routes from CSRF where appropriate
     try:
         from agentsdr.orgs.routes import summarize_emails
@@ -53,16 +74,38 @@ def create_app(config_name=None):
 
     # User loader for Flask-Login
     from agentsdr.auth.models import User
+
+    @app.before_request
+    def init_user_cache():
+        # Flask-Login may invoke the loader several times per request;
+        # memoize the User object on g so we hit Supabase at most once.
+        g._user_cache = {}
+
+    @app.teardown_request
+    def drop_supabase_client(exc):
+        # The per-request, auth-mutated client must not outlive its request
+        # (see SupabaseManager.get_client)
+        g.pop('supabase_client', None)
+
     @login_manager.user_loader
     def load_user(user_id):
-        return User.get_by_id(user_id)
+        cache = getattr(g, '_user_cache', None)
+        if cache is None:
+            cache = g._user_cache = {}
+        if user_id not in cache:
+            cache[user_id] = User.get_by_id(user_id)
+        return cache[user_id]
 
-    # Context processor to inject version info into all templates
+    # Context processor to inject version info into all templates.
+    # Version info is constant for the process lifetime, so read
+    # version.json once at startup instead of on every render.
     from agentsdr.utils.version import get_version_info
+    version_info = get_version_info()
+
     @app.context_processor
     def inject_version_info():
         return {
-            'app_version': get_version_info()
+            'app_version': version_info
         }
 
     return app
@@ -2,8 +2,49 @@ from flask_login import UserMixin
 from agentsdr.core.supabase_client import get_supabase, get_service_supabase
 from agentsdr.core.models import User as UserModel
 from typing import Optional
+import logging
+import time
 import uuid
 
+logger = logging.getLogger(__name__)
+
+# Short-lived cache of user rows so repeated lookups across requests
+# (e.g. the Flask-Login loader) don't each pay a Supabase round-trip.
+_USER_ROW_TTL_SECONDS = 60
+_user_row_cache = {}
+
+def _fetch_user_row(user_id: str) -> Optional[dict]:
+    """Fetch a user row by ID, caching it for a short TTL."""
+    cached = _user_row_cache.get(user_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    supabase = get_service_supabase()
+    response = supabase.table('users').select('id, email, display_name, is_super_admin').eq('id', user_id).limit(1).execute()
+    row = response.data[0] if response.data else None
+    _user_row_cache[user_id] = (time.monotonic() + _USER_ROW_TTL_SECONDS, row)
+    return row
+
+def invalidate_user_row(user_id: str = None):
+    """Drop a cached user row (or the whole cache) after logout/update."""
+    if user_id is None:
+        _user_row_cache.clear()
+    else:
+        _user_row_cache.pop(user_id, None)
+
+def invalidate_org_cache(user_id: str):
+    """Drop a user's cached org memberships after a membership change."""
+    from agentsdr.core.cache import (
+        all_agents_cache_key,
+        cache_delete,
+        dashboard_cache_key,
+        orgs_cache_key,
+    )
+    cache_delete(orgs_cache_key(user_id))
+    # The dashboard and agents views render from the same memberships
+    cache_delete(dashboard_cache_key(user_id))
+    cache_delete(all_agents_cache_key(user_id))
+
 class User(UserMixin):
     def __init__(self, id: str, email: str, display_name: str = None, is_super_admin: bool = False):
         self.id = id
@@ -15,11 +56,8 @@ class User(UserMixin):
     def get_by_id(user_id: str) -> Optional['User']:
         """Get user by ID from Supabase"""
         try:
-            supabase = get_service_supabase()
-            response = supabase.table('users').select('*').eq('id', user_id).execute()
-            
-            if response.data:
-                user_data = response.data[0]
+            user_data = _fetch_user_row(user_id)
+            if user_data:
                 return User(
                     id=user_data['id'],
                     email=user_data['email'],
@@ -27,7 +65,7 @@ class User(UserMixin):
                     is_super_admin=user_data.get('is_super_admin', False)
                 )
         except Exception as e:
-            print(f"Error getting user by ID: {e}")
+            logger.error("Error getting user by ID: %s", e)
         return None
     
     @staticmethod
@@ -35,7 +73,7 @@ class User(UserMixin):
         """Get user by email from Supabase"""
         try:
             supabase = get_service_supabase()
-            response = supabase.table('users').select('*').eq('email', email).execute()
+            response = supabase.table('users').select('id, email, display_name, is_super_admin').eq('email', email).limit(1).execute()
             
             if response.data:
                 user_data = response.data[0]
@@ -46,7 +84,7 @@ class User(UserMixin):
                     is_super_admin=user_data.get('is_super_admin', False)
                 )
         except Exception as e:
-            print(f"Error getting user by email: {e}")
+            logger.error("Error getting user by email: %s", e)
         return None
     
     @staticmethod
@@ -76,7 +114,7 @@ class User(UserMixin):
 
             if response.data:
                 user_role = "Super Admin" if is_super_admin else "User"
-                print(f"Created {user_role}: {email}")
+                logger.info("Created %s: %s", user_role, email)
 
                 return User(
                     id=user_data['id'],
@@ -85,17 +123,28 @@ class User(UserMixin):
                     is_super_admin=is_super_admin
                 )
         except Exception as e:
-            print(f"Error creating user: {e}")
+            logger.error("Error creating user: %s", e)
         return None
     
     def get_organizations(self):
-        """Get all organizations the user is a member of"""
+        """Get all organizations the user is a member of
+
+        Memberships rarely change, so they are cached in Redis for a few
+        minutes; membership mutations call invalidate_org_cache().
+        """
         try:
+            from agentsdr.core.cache import cache_get_json, cache_set_json, orgs_cache_key
+            cache_key = orgs_cache_key(self.id)
+            cached = cache_get_json(cache_key)
+            if cached is not None:
+                return cached
+
             supabase = get_supabase()
             response = supabase.table('organization_members').select('org_id, role').eq('user_id', self.id).execute()
+            cache_set_json(cache_key, response.data or [], ttl=300)
             return response.data
         except Exception as e:
-            print(f"Error getting user organizations: {e}")
+            logger.error("Error getting user organizations: %s", e)
             return []
     
     def __repr__(self):
@@ -2,14 +2,20 @@ from flask import render_template, redirect, url_for, flash, request, session, c
 from flask_login import login_user, logout_user, login_required, current_user
 from agentsdr.auth import auth_bp
 from agentsdr.auth.forms import LoginForm, SignupForm, ForgotPasswordForm, ResetPasswordForm
-from agentsdr.auth.models import User
+from agentsdr.auth.models import User, invalidate_user_row, invalidate_org_cache
 from agentsdr.core.supabase_client import get_supabase, supabase
-from agentsdr.core.email import get_email_service
+from agentsdr.core.email_tasks import queue_welcome_email
 from agentsdr.core.rbac import require_super_admin
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
 import secrets
 
+def _parse_iso8601(value: str) -> datetime:
+    """Parse an ISO-8601 timestamp from PostgREST, tolerating a 'Z' suffix."""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
@@ -109,32 +115,44 @@ def signup():
                     else:
                         # User exists in Auth but not in our database - sync them
                         try:
-                            # Get user from Auth and create in database
-                            auth_users = supabase_client.auth.admin.list_users()
-                            for auth_user in auth_users:
-                                if auth_user.email == form.email.data:
-                                    # Create user in database with the Auth user's ID
-                                    from agentsdr.core.supabase_client import get_service_supabase
-                                    service_supabase = get_service_supabase()
-                                    
-                                    user_data = {
-                                        'id': auth_user.id,
-                                        'email': auth_user.email,
-                                        'display_name': form.display_name.data,
-                                        'is_super_admin': False
-                                    }
-                                    
-                                    result = service_supabase.table('users').insert(user_data).execute()
-                                    if result.data:
-                                        user = User(
-                                            id=auth_user.id,
-                                            email=auth_user.email,
-                                            display_name=form.display_name.data
-                                        )
-                                        login_user(user)
-                                        flash('Account synced successfully! Welcome back!', 'success')
-                                        return redirect(url_for('main.dashboard'))
-                                    break
+                            # Look up the Auth user directly instead of downloading
+                            # and scanning the entire user list
+                            auth_user = None
+                            try:
+                                auth_user = supabase_client.auth.admin.get_user_by_email(form.email.data).user
+                            except AttributeError:
+                                # Older SDKs lack the direct lookup; page through
+                                # users and stop at the first match
+                                page = 1
+                                while auth_user is None:
+                                    batch = supabase_client.auth.admin.list_users(page=page, per_page=100)
+                                    if not batch:
+                                        break
+                                    auth_user = next((u for u in batch if u.email == form.email.data), None)
+                                    page += 1
+
+                            if auth_user:
+                                # Create user in database with the Auth user's ID
+                                from agentsdr.core.supabase_client import get_service_supabase
+                                service_supabase = get_service_supabase()
+
+                                user_data = {
+                                    'id': auth_user.id,
+                                    'email': auth_user.email,
+                                    'display_name': form.display_name.data,
+                                    'is_super_admin': False
+                                }
+
+                                result = service_supabase.table('users').insert(user_data).execute()
+                                if result.data:
+                                    user = User(
+                                        id=auth_user.id,
+                                        email=auth_user.email,
+                                        display_name=form.display_name.data
+                                    )
+                                    login_user(user)
+                                    flash('Account synced successfully! Welcome back!', 'success')
+                                    return redirect(url_for('main.dashboard'))
                         except Exception as sync_error:
                             current_app.logger.error(f"Error syncing user: {sync_error}")
                         
@@ -153,6 +171,7 @@ def signup():
 @auth_bp.route('/logout')
 @login_required
 def logout():
+    invalidate_user_row(current_user.id)
     logout_user()
     supabase.clear_session()
     flash('You have been logged out.', 'info')
@@ -168,8 +187,9 @@ def accept_invitation():
     try:
         supabase_client = get_supabase()
         
-        # Get invitation details
-        response = supabase_client.table('invitations').select('*').eq('token', token).execute()
+        # Get invitation details (token is UNIQUE, so the lookup is
+        # index-backed; fetch only the columns the flow reads)
+        response = supabase_client.table('invitations').select('id, org_id, email, role, token, expires_at, accepted_at').eq('token', token).limit(1).execute()
         
         if not response.data:
             flash('Invalid or expired invitation.', 'error')
@@ -178,8 +198,8 @@ def accept_invitation():
         invitation = response.data[0]
         
         # Check if invitation is expired
-        expires_at = datetime.fromisoformat(invitation['expires_at'].replace('Z', '+00:00'))
-        if datetime.now(expires_at.tzinfo) > expires_at:
+        expires_at = _parse_iso8601(invitation['expires_at'])
+        if datetime.now(timezone.utc) > expires_at:
             flash('This invitation has expired.', 'error')
             return redirect(url_for('auth.login'))
         
@@ -260,24 +280,18 @@ def _accept_invitation_for_user(user, invitation, organization):
     """Helper function to accept invitation for a user"""
     try:
         supabase_client = get_supabase()
-        
-        # Add user to organization
-        member_data = {
-            'org_id': invitation['org_id'],
-            'user_id': user.id,
-            'role': invitation['role'],
-            'joined_at': datetime.utcnow().isoformat()
-        }
-        
-        supabase_client.table('organization_members').insert(member_data).execute()
-        
-        # Mark invitation as accepted
-        supabase_client.table('invitations').update({
-            'accepted_at': datetime.utcnow().isoformat()
-        }).eq('id', invitation['id']).execute()
-        
-        # Send welcome email
-        get_email_service().send_welcome_email(user.email, organization['name'])
+
+        # Validate, add the member and mark the invitation accepted in one
+        # atomic round-trip (see supabase/migrations/002_accept_invitation_rpc.sql)
+        supabase_client.rpc('accept_invitation', {
+            'p_token': invitation['token'],
+            'p_user_id': user.id
+        }).execute()
+
+        invalidate_org_cache(user.id)
+
+        # Send welcome email off the request thread
+        queue_welcome_email(user.email, organization['name'])
         
         flash(f'Welcome to {organization["name"]}!', 'success')
         return redirect(url_for('main.dashboard'))
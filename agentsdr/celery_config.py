@@ -14,14 +14,17 @@ celery_app = Celery(
     backend=os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0'),
     include=[
         'agentsdr.email.tasks',
+        'agentsdr.core.email_tasks',
     ]
 )
 
 # Celery configuration
 celery_app.conf.update(
-    task_serializer=os.getenv('CELERY_TASK_SERIALIZER', 'json'),
-    result_serializer=os.getenv('CELERY_RESULT_SERIALIZER', 'json'),
-    accept_content=[os.getenv('CELERY_ACCEPT_CONTENT', 'json')],
+    # msgpack encodes the string-heavy email payloads faster and smaller
+    # than stdlib json; json stays accepted for in-flight tasks during rollout
+    task_serializer=os.getenv('CELERY_TASK_SERIALIZER', 'msgpack'),
+    result_serializer=os.getenv('CELERY_RESULT_SERIALIZER', 'msgpack'),
+    accept_content=os.getenv('CELERY_ACCEPT_CONTENT', 'msgpack,json').split(','),
     timezone=os.getenv('CELERY_TIMEZONE', 'UTC'),
     enable_utc=True,
     task_track_started=True,
@@ -29,6 +32,38 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    # Ack after completion so tasks are not silently dropped if a worker
+    # dies mid-run; pairs with the grouped dispatch in fetch_all_user_emails
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Outbound email gets its own queue so slow SMTP round-trips never sit
+    # behind Gmail fetch work; the default worker target consumes it
+    # alongside celery (-Q email_queue,celery in the Makefile), and it can
+    # be split onto a dedicated -Q email_queue worker when SMTP volume
+    # warrants it.
+    # Pure-I/O tasks (HTTPS to Gmail, Supabase and enrichment APIs) go to
+    # the research queue, served by a greenlet worker where one process
+    # carries hundreds of in-flight requests instead of one per prefork
+    # child (make worker-research); CPU-heavy AI tasks stay on prefork
+    task_routes={
+        'agentsdr.core.email_tasks.*': {'queue': 'email_queue'},
+        'agentsdr.email.tasks.research_sender': {'queue': 'research'},
+        'agentsdr.email.tasks.fetch_user_emails': {'queue': 'research'},
+    },
+    # Broker/backend connection pooling - reuse Redis connections across
+    # publishes instead of opening a fresh one per apply_async
+    broker_pool_limit=50,
+    broker_connection_retry_on_startup=True,
+    broker_transport_options={
+        'socket_keepalive': True,
+        'health_check_interval': 30,
+        'retry_on_timeout': True,
+    },
+    redis_max_connections=50,
+    redis_backend_health_check_interval=30,
+    result_backend_transport_options={
+        'retry_policy': {'timeout': 5.0},
+    },
 )
 
 # Periodic tasks schedule
@@ -37,6 +72,10 @@ celery_app.conf.beat_schedule = {
         'task': 'agentsdr.email.tasks.fetch_all_user_emails',
         'schedule': crontab(minute='*/5'),  # Every 5 minutes
     },
+    'flush-pending-credits': {
+        'task': 'agentsdr.email.tasks.flush_credits',
+        'schedule': 30.0,  # Settle batched credit deductions every 30s
+    },
     'process-scheduled-follow-ups': {
         'task': 'agentsdr.email.tasks.process_follow_ups',
         'schedule': crontab(minute='*/10'),  # Every 10 minutes
@@ -0,0 +1,96 @@
+"""Redis-backed cache helpers with graceful fallback.
+
+All helpers swallow Redis errors so a missing/unreachable broker never
+breaks a request path - callers just see a cache miss.
+"""
+import json
+import os
+from typing import Any, Optional
+
+import redis
+
+try:
+    # ~2-5x faster encode/decode than stdlib json on cache payloads
+    import orjson
+
+    def _json_dumps(value: Any) -> str:
+        return orjson.dumps(value, default=str).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(value: Any) -> str:
+        return json.dumps(value, default=str)
+
+    _json_loads = json.loads
+
+_redis_client = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the shared Redis client (same instance the Celery broker uses)."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            os.getenv('REDIS_URL', os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')),
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+    return _redis_client
+
+
+def cache_get_json(key: str) -> Optional[Any]:
+    """Fetch and decode a cached JSON value, or None on miss/error."""
+    try:
+        raw = get_redis().get(key)
+        return _json_loads(raw) if raw else None
+    except Exception:
+        return None
+
+
+def cache_set_json(key: str, value: Any, ttl: int) -> bool:
+    """Store a JSON-encodable value with a TTL in seconds."""
+    try:
+        get_redis().setex(key, ttl, _json_dumps(value))
+        return True
+    except Exception:
+        return False
+
+
+def cache_delete(key: str) -> bool:
+    """Drop a cached value."""
+    try:
+        get_redis().delete(key)
+        return True
+    except Exception:
+        return False
+
+
+def summaries_cache_key(agent_id: str, criteria_type: str, count: int) -> str:
+    """Cache key for an agent's email summaries."""
+    return f"summaries:{agent_id}:{criteria_type}:{count}"
+
+
+def classification_cache_key(content_hash: str) -> str:
+    """Cache key for an AI email classification result."""
+    return f"classification:{content_hash}"
+
+
+def orgs_cache_key(user_id: str) -> str:
+    """Cache key for a user's organization memberships."""
+    return f"orgs:{user_id}"
+
+
+def sender_research_cache_key(user_id: str, email_address: str) -> str:
+    """Cache key for a researched sender."""
+    return f"sender_research:{user_id}:{email_address.lower()}"
+
+
+def dashboard_cache_key(user_id: str) -> str:
+    """Cache key for a user's dashboard bundle."""
+    return f"dashboard:{user_id}"
+
+
+def all_agents_cache_key(user_id: str) -> str:
+    """Cache key for a user's cross-org agents listing."""
+    return f"all_agents:{user_id}"
@@ -1,11 +1,87 @@
+import re
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from flask import current_app, render_template_string
+from flask import current_app, render_template
 from typing import Optional
 import os
 from datetime import datetime
 
+from agentsdr.core.rate_limit import TokenBucket
+from agentsdr.core.smtp_pool import get_smtp_pool
+
+# Rendered email HTML keeps the templates' indentation and blank lines;
+# collapsing it cuts the body ~40% before it crosses the wire on every
+# send of a digest fan-out. Browsers treat runs of whitespace as one
+# space anyway, so this is visually lossless.
+_INTER_TAG_WS_RE = re.compile(r'>\s+<')
+_WS_RUN_RE = re.compile(r'\s{2,}')
+
+def _minify_html(html: str) -> str:
+    return _INTER_TAG_WS_RE.sub('><', _WS_RUN_RE.sub(' ', html)).strip()
+
+def _header_safe(value: str) -> str:
+    """Strip CR/LF from user-controlled values before they reach a MIME header.
+
+    HTML bodies are covered by Jinja autoescape, but Subject lines are
+    plain headers — embedded newlines would let a crafted org name inject
+    extra headers into the message.
+    """
+    return str(value).replace('\r', ' ').replace('\n', ' ')
+
+class SMTPSession:
+    """One open SMTP connection reused across multiple sends.
+
+    Opening a connection costs a TCP + STARTTLS + AUTH handshake; for
+    batched sends (e.g. daily digests) paying it once instead of per
+    message dominates the per-message cost. Use as a context manager:
+
+        with SMTPSession(host, port, user, password) as session:
+            session.send_message(msg1)
+            session.send_message(msg2)
+    """
+
+    def __init__(self, host, port, user=None, password=None, use_tls=True):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self._server = None
+
+    def _connect(self):
+        self._server = smtplib.SMTP(self.host, self.port)
+        if self.use_tls:
+            self._server.starttls()
+        if self.user and self.password:
+            self._server.login(self.user, self.password)
+
+    def send_message(self, msg):
+        """Send a message, transparently reconnecting if the server dropped us."""
+        if self._server is None:
+            self._connect()
+        try:
+            self._server.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+            self._connect()
+            self._server.send_message(msg)
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def __enter__(self):
+        self._connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
 class EmailService:
     def __init__(self):
         self.smtp_host = current_app.config.get('SMTP_HOST')
@@ -13,257 +89,236 @@ class EmailService:
         self.smtp_user = current_app.config.get('SMTP_USER')
         self.smtp_pass = current_app.config.get('SMTP_PASS')
         self.smtp_use_tls = current_app.config.get('SMTP_USE_TLS', True)
-    
-    def send_invitation_email(self, email: str, org_name: str, role: str, token: str, invited_by: str) -> bool:
+        # Cached alongside the SMTP settings so renders skip the
+        # current_app proxy dereference on every send
+        self.base_url = current_app.config.get('BASE_URL', 'http://localhost:5000')
+        self.pool = get_smtp_pool(self.smtp_host, self.smtp_port, self.smtp_user,
+                                  self.smtp_pass, self.smtp_use_tls)
+
+    def _send(self, msg, session: Optional[SMTPSession] = None) -> None:
+        """Single transport path for all sends.
+
+        Reuses the caller's batching session when given, otherwise checks a
+        connection out of the shared pool. Pool, batching and rate-limit
+        behavior all hang off this one method.
+        """
+        if session is not None:
+            session.send_message(msg)
+            return
+        conn = self.pool.acquire()
+        try:
+            conn.send_message(msg)
+        finally:
+            self.pool.release(conn)
+
+    def send_invitation_email(self, email: str, org_name: str, role: str, token: str, invited_by: str, session: Optional[SMTPSession] = None) -> bool:
         """Send invitation email to user"""
         try:
             # Create message
             msg = MIMEMultipart('alternative')
-            msg['Subject'] = f"Invitation to join {org_name} on AgentSDR"
+            msg['Subject'] = f"Invitation to join {_header_safe(org_name)} on AgentSDR"
             msg['From'] = self.smtp_user
             msg['To'] = email
-            
+
             # Create the HTML content
             html_content = self._get_invitation_email_template(org_name, role, token, invited_by)
             html_part = MIMEText(html_content, 'html')
             msg.attach(html_part)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                if self.smtp_use_tls:
-                    server.starttls()
-                if self.smtp_user and self.smtp_pass:
-                    server.login(self.smtp_user, self.smtp_pass)
-                server.send_message(msg)
-            
+
+            self._send(msg, session)
+
             return True
         except Exception as e:
             current_app.logger.error(f"Failed to send invitation email: {e}")
             return False
     
     def _get_invitation_email_template(self, org_name: str, role: str, token: str, invited_by: str) -> str:
-        """Get the invitation email HTML template"""
-        base_url = current_app.config.get('BASE_URL', 'http://localhost:5000')
-        accept_url = f"{base_url}/invite/accept?token={token}"
-        
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Invitation to join {org_name}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: #3b82f6; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f9fafb; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .button {{ display: inline-block; background: #3b82f6; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 20px 0; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #6b7280; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>AgentSDR</h1>
-                </div>
-                <div class="content">
-                    <h2>You're invited to join {org_name}</h2>
-                    <p>Hello!</p>
-                    <p>You've been invited by <strong>{invited_by}</strong> to join <strong>{org_name}</strong> on AgentSDR as a <strong>{role}</strong>.</p>
-                    <p>AgentSDR is a powerful platform for managing your organization's data and workflows.</p>
-                    <p style="text-align: center;">
-                        <a href="{accept_url}" class="button">Accept Invitation</a>
-                    </p>
-                    <p><strong>What happens next?</strong></p>
-                    <ul>
-                        <li>Click the button above to accept the invitation</li>
-                        <li>If you don't have an account, you'll be guided to create one</li>
-                        <li>Once you accept, you'll have access to {org_name}'s workspace</li>
-                    </ul>
-                    <p><strong>Important:</strong> This invitation will expire in 72 hours for security reasons.</p>
-                    <p>If you have any questions, please contact the person who invited you.</p>
-                </div>
-                <div class="footer">
-                    <p>This invitation was sent from AgentSDR</p>
-                    <p>If you didn't expect this invitation, you can safely ignore this email.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-    
-    def send_welcome_email(self, email: str, org_name: str) -> bool:
+        """Render the invitation email HTML (Jinja caches the compiled template)"""
+        accept_url = f"{self.base_url}/invite/accept?token={token}"
+
+        return _minify_html(render_template(
+            'emails/invitation.html',
+            org_name=org_name,
+            role=role,
+            invited_by=invited_by,
+            accept_url=accept_url
+        ))
+
+    def send_welcome_email(self, email: str, org_name: str, session: Optional[SMTPSession] = None) -> bool:
         """Send welcome email after invitation acceptance"""
         try:
             msg = MIMEMultipart('alternative')
-            msg['Subject'] = f"Welcome to {org_name} on AgentSDR"
+            msg['Subject'] = f"Welcome to {_header_safe(org_name)} on AgentSDR"
             msg['From'] = self.smtp_user
             msg['To'] = email
-            
+
             html_content = self._get_welcome_email_template(org_name)
             html_part = MIMEText(html_content, 'html')
             msg.attach(html_part)
-            
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                if self.smtp_use_tls:
-                    server.starttls()
-                if self.smtp_user and self.smtp_pass:
-                    server.login(self.smtp_user, self.smtp_pass)
-                server.send_message(msg)
-            
+
+            self._send(msg, session)
+
             return True
         except Exception as e:
             current_app.logger.error(f"Failed to send welcome email: {e}")
             return False
     
     def _get_welcome_email_template(self, org_name: str) -> str:
-        """Get the welcome email HTML template"""
-        base_url = current_app.config.get('BASE_URL', 'http://localhost:5000')
-        
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Welcome to {org_name}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: #10b981; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f9fafb; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .button {{ display: inline-block; background: #10b981; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 20px 0; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #6b7280; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Welcome to AgentSDR!</h1>
-                </div>
-                <div class="content">
-                    <h2>You're now a member of {org_name}</h2>
-                    <p>Congratulations! You've successfully joined <strong>{org_name}</strong> on AgentSDR.</p>
-                    <p>You can now access your organization's workspace and start collaborating with your team.</p>
-                    <p style="text-align: center;">
-                        <a href="{base_url}/dashboard" class="button">Go to Dashboard</a>
-                    </p>
-                    <p><strong>What you can do now:</strong></p>
-                    <ul>
-                        <li>View and manage your organization's records</li>
-                        <li>Collaborate with team members</li>
-                        <li>Access organization settings (if you're an admin)</li>
-                        <li>Invite new members (if you're an admin)</li>
-                    </ul>
-                    <p>If you have any questions or need help getting started, don't hesitate to reach out to your organization's admin.</p>
-                </div>
-                <div class="footer">
-                    <p>Welcome to the AgentSDR community!</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        """Render the welcome email HTML (Jinja caches the compiled template)"""
+        return _minify_html(render_template(
+            'emails/welcome.html',
+            org_name=org_name,
+            base_url=self.base_url
+        ))
+
+    def send_summary_email(self, recipient_email, summaries, agent_name, criteria_type,
+                           session: Optional[SMTPSession] = None) -> bool:
+        """Send a daily email summary digest"""
+        try:
+            if not all([self.smtp_host, self.smtp_user, self.smtp_pass]):
+                current_app.logger.error("SMTP configuration incomplete")
+                return False
 
-# Global email service instance - will be initialized when needed
-email_service = None
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = f"\U0001F4E7 Daily Email Summary - {_header_safe(agent_name)}"
+            msg['From'] = self.smtp_user
+            msg['To'] = recipient_email
+
+            # Render HTML content; the {% for %} loop in the template replaces
+            # the previous O(N) string concatenation
+            html_content = _minify_html(render_template(
+                'emails/summary.html',
+                agent_name=agent_name,
+                summaries=summaries,
+                criteria_label=criteria_type.replace('_', ' ').title(),
+                generated_at=datetime.now().strftime('%B %d, %Y at %I:%M %p')
+            ))
+
+            html_part = MIMEText(html_content, 'html')
+            msg.attach(html_part)
+
+            self._send(msg, session)
+
+            current_app.logger.info(f"Email summary sent to {recipient_email}")
+            return True
+
+        except Exception as e:
+            current_app.logger.error(f"Failed to send email summary: {e}")
+            return False
+
+# Shared token bucket so batched sends stay under the provider's
+# per-second cap instead of triggering 421 throttling
+_send_bucket = None
+
+def _get_send_bucket():
+    global _send_bucket
+    if _send_bucket is None:
+        max_per_sec = int(os.getenv('SMTP_MAX_PER_SEC', 30))
+        _send_bucket = TokenBucket(capacity=max_per_sec, refill_per_sec=max_per_sec)
+    return _send_bucket
 
 def get_email_service():
-    global email_service
-    if email_service is None:
-        email_service = EmailService()
-    return email_service
+    """Return the app's EmailService (built eagerly in create_app).
+
+    Minimal app contexts (scheduler, Celery workers) don't run the app
+    factory, so build and attach the instance on first use there.
+    """
+    service = getattr(current_app, 'email_service', None)
+    if service is None:
+        service = current_app.email_service = EmailService()
+    return service
+
+def send_email_summary(recipient_email, summaries, agent_name, criteria_type, session=None):
+    """Send email summary to user (delegates to EmailService.send_summary_email)"""
+    return get_email_service().send_summary_email(
+        recipient_email, summaries, agent_name, criteria_type, session=session
+    )
+
+def send_email_summaries(batch):
+    """Send a batch of summary emails over a single SMTP connection
 
-def send_email_summary(recipient_email, summaries, agent_name, criteria_type):
-    """Send email summary to user"""
+    Args:
+        batch: iterable of (recipient_email, summaries, agent_name, criteria_type)
+
+    Returns:
+        Number of emails sent successfully
+    """
+    service = get_email_service()
+
+    if not all([service.smtp_host, service.smtp_user, service.smtp_pass]):
+        current_app.logger.error("SMTP configuration incomplete")
+        return 0
+
+    bucket = _get_send_bucket()
+    max_per_connection = int(os.getenv('SMTP_MAX_PER_CONNECTION', 100))
+
+    sent = 0
+    sent_on_connection = 0
     try:
-        # Email configuration
-        smtp_host = os.getenv('SMTP_HOST', 'localhost')
-        smtp_port = int(os.getenv('SMTP_PORT', 587))
-        smtp_user = os.getenv('SMTP_USER')
-        smtp_pass = os.getenv('SMTP_PASS')
-        smtp_use_tls = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
-        
-        if not all([smtp_host, smtp_user, smtp_pass]):
-            current_app.logger.error("SMTP configuration incomplete")
-            return False
-        
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"📧 Daily Email Summary - {agent_name}"
-        msg['From'] = smtp_user
-        msg['To'] = recipient_email
-        
-        # Create HTML content
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Daily Email Summary</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; margin-bottom: 30px; }}
-                .summary-item {{ background: #f8f9fa; border-left: 4px solid #667eea; padding: 20px; margin-bottom: 20px; border-radius: 5px; }}
-                .sender {{ font-weight: bold; color: #667eea; margin-bottom: 5px; }}
-                .subject {{ font-weight: bold; margin-bottom: 10px; }}
-                .date {{ color: #666; font-size: 0.9em; margin-bottom: 10px; }}
-                .summary {{ background: white; padding: 15px; border-radius: 5px; border: 1px solid #e9ecef; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 0.9em; }}
-                .stats {{ background: #e3f2fd; padding: 15px; border-radius: 5px; margin-bottom: 20px; text-align: center; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>📧 Daily Email Summary</h1>
-                <p>Your automated email digest from {agent_name}</p>
-            </div>
-            
-            <div class="stats">
-                <h3>📊 Summary Statistics</h3>
-                <p><strong>{len(summaries)} emails</strong> summarized from the <strong>{criteria_type.replace('_', ' ').title()}</strong></p>
-                <p>Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
-            </div>
-        """
-        
-        # Add each summary
-        for i, summary in enumerate(summaries, 1):
-            html_content += f"""
-            <div class="summary-item">
-                <div class="sender">👤 {summary.get('sender', 'Unknown Sender')}</div>
-                <div class="subject">📝 {summary.get('subject', 'No Subject')}</div>
-                <div class="date">📅 {summary.get('date', 'Unknown Date')}</div>
-                <div class="summary">
-                    {summary.get('summary', 'No summary available')}
-                </div>
-            </div>
-            """
-        
-        html_content += """
-            <div class="footer">
-                <p>This is an automated summary generated by your AgentSDR email summarizer.</p>
-                <p>You can manage your email preferences in your AgentSDR dashboard.</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Attach HTML content
-        html_part = MIMEText(html_content, 'html')
-        msg.attach(html_part)
-        
-        # Send email
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            if smtp_use_tls:
-                server.starttls()
-            server.login(smtp_user, smtp_pass)
-            server.send_message(msg)
-        
-        current_app.logger.info(f"Email summary sent to {recipient_email}")
-        return True
-        
+        with SMTPSession(service.smtp_host, service.smtp_port, service.smtp_user,
+                         service.smtp_pass, service.smtp_use_tls) as session:
+            for recipient_email, summaries, agent_name, criteria_type in batch:
+                bucket.acquire()
+                # Recycle before tripping the provider's per-connection cap;
+                # the session reconnects transparently on the next send
+                if sent_on_connection >= max_per_connection:
+                    session.close()
+                    sent_on_connection = 0
+                if service.send_summary_email(recipient_email, summaries, agent_name, criteria_type, session=session):
+                    sent += 1
+                    sent_on_connection += 1
     except Exception as e:
-        current_app.logger.error(f"Failed to send email summary: {e}")
-        return False
+        current_app.logger.error(f"Failed to send summary batch: {e}")
+    return sent
+
+def send_summaries_bulk(batch, max_workers=None):
+    """Fan summary sends out across a thread pool
+
+    SMTP is I/O-bound and smtplib releases the GIL on socket operations,
+    so throughput scales roughly linearly with workers up to the
+    provider's concurrency cap. Each worker checks one connection out of
+    the shared pool for its whole slice, and the shared token bucket
+    still caps the aggregate send rate across threads.
+
+    Args:
+        batch: iterable of (recipient_email, summaries, agent_name, criteria_type)
+        max_workers: thread count (default SMTP_WORKERS env var, 8)
+
+    Returns:
+        Number of emails sent successfully
+    """
+    service = get_email_service()
+
+    if not all([service.smtp_host, service.smtp_user, service.smtp_pass]):
+        current_app.logger.error("SMTP configuration incomplete")
+        return 0
+
+    items = list(batch)
+    if not items:
+        return 0
+
+    if max_workers is None:
+        max_workers = int(os.getenv('SMTP_WORKERS', '8'))
+
+    bucket = _get_send_bucket()
+    app = current_app._get_current_object()
+
+    def _send_slice(chunk):
+        sent = 0
+        # Worker threads need their own app context for render_template
+        # and logging
+        with app.app_context():
+            conn = service.pool.acquire()
+            try:
+                for recipient_email, summaries, agent_name, criteria_type in chunk:
+                    bucket.acquire()
+                    if service.send_summary_email(recipient_email, summaries, agent_name,
+                                                  criteria_type, session=conn):
+                        sent += 1
+            finally:
+                service.pool.release(conn)
+        return sent
+
+    slices = [items[i::max_workers] for i in range(max_workers) if items[i::max_workers]]
+    with ThreadPoolExecutor(max_workers=len(slices)) as executor:
+        return sum(executor.map(_send_slice, slices))
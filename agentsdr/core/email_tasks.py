@@ -0,0 +1,88 @@
+"""
+Celery tasks for outbound email
+
+Request handlers enqueue onto a dedicated 'email_queue' instead of blocking
+on the SMTP round-trip; a worker drains the queue through the pooled,
+batched senders in agentsdr.core.email. Run the worker with:
+
+    celery -A agentsdr.celery_config worker -Q email_queue --concurrency=2
+"""
+
+from typing import Any, Dict, List
+
+from flask import Flask, current_app, has_app_context
+
+from agentsdr.celery_config import celery_app
+
+
+def _app_context():
+    """Minimal app context for worker processes (same pattern as scheduler.py)."""
+    app = Flask(__name__, template_folder='../templates')
+    app.config.from_object('config.Config')
+    return app.app_context()
+
+
+@celery_app.task(name='agentsdr.core.email_tasks.send_invitation_email',
+                 bind=True, max_retries=5, default_retry_delay=30)
+def send_invitation_email(self, email: str, org_name: str, role: str, token: str, invited_by: str):
+    with _app_context():
+        from agentsdr.core.email import get_email_service
+        sent = get_email_service().send_invitation_email(email, org_name, role, token, invited_by)
+    if not sent:
+        raise self.retry()
+    return {'status': 'sent', 'email': email}
+
+
+@celery_app.task(name='agentsdr.core.email_tasks.send_welcome_email',
+                 bind=True, max_retries=5, default_retry_delay=30)
+def send_welcome_email(self, email: str, org_name: str):
+    with _app_context():
+        from agentsdr.core.email import get_email_service
+        sent = get_email_service().send_welcome_email(email, org_name)
+    if not sent:
+        raise self.retry()
+    return {'status': 'sent', 'email': email}
+
+
+@celery_app.task(name='agentsdr.core.email_tasks.send_email_summary',
+                 bind=True, max_retries=5, default_retry_delay=30)
+def send_email_summary(self, recipient_email: str, summaries: List[Dict[str, Any]],
+                       agent_name: str, criteria_type: str):
+    with _app_context():
+        from agentsdr.core.email import send_email_summary as send_summary
+        sent = send_summary(recipient_email, summaries, agent_name, criteria_type)
+    if not sent:
+        raise self.retry()
+    return {'status': 'sent', 'email': recipient_email}
+
+
+@celery_app.task(name='agentsdr.core.email_tasks.send_email_summaries')
+def send_email_summaries(batch: List[Any]) -> int:
+    """Send a batch of summary emails over one SMTP connection."""
+    with _app_context():
+        from agentsdr.core.email import send_email_summaries as send_batch
+        return send_batch(batch)
+
+
+def queue_invitation_email(email: str, org_name: str, role: str, token: str, invited_by: str) -> bool:
+    """Enqueue an invitation email; send inline if the broker is unreachable."""
+    try:
+        send_invitation_email.delay(email, org_name, role, token, invited_by)
+        return True
+    except Exception as e:
+        if has_app_context():
+            current_app.logger.error(f"Email queue unavailable, sending inline: {e}")
+        from agentsdr.core.email import get_email_service
+        return get_email_service().send_invitation_email(email, org_name, role, token, invited_by)
+
+
+def queue_welcome_email(email: str, org_name: str) -> bool:
+    """Enqueue a welcome email; send inline if the broker is unreachable."""
+    try:
+        send_welcome_email.delay(email, org_name)
+        return True
+    except Exception as e:
+        if has_app_context():
+            current_app.logger.error(f"Email queue unavailable, sending inline: {e}")
+        from agentsdr.core.email import get_email_service
+        return get_email_service().send_welcome_email(email, org_name)
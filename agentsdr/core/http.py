@@ -0,0 +1,24 @@
+"""Shared outbound HTTP session with connection pooling and retries."""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Default (connect, read) timeout so a stalled upstream can't pin a worker
+DEFAULT_TIMEOUT = (3, 10)
+
+# One pooled session for all outbound calls (Google OAuth, Gmail token
+# refresh, ...). Keep-alive reuses the TCP/TLS connection across requests
+# instead of paying a fresh handshake on every call.
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+)
+
+http_session = requests.Session()
+http_session.mount('https://', _adapter)
+http_session.mount('http://', _adapter)
@@ -0,0 +1,47 @@
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket for smoothing bursty work.
+
+    Holds up to `capacity` tokens and refills at `refill_per_sec`.
+    Callers take one token per unit of work:
+
+        bucket = TokenBucket(capacity=30, refill_per_sec=30)
+        bucket.acquire()  # blocks until a token is available
+
+    Used to keep outbound SMTP under provider per-second caps so bursty
+    digest runs don't trigger 421 throttling and the retry storms that
+    follow it.
+    """
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_sec)
+            self._last_refill = now
+
+    def acquire(self, block: bool = True) -> bool:
+        """Take one token, waiting for a refill if necessary.
+
+        Returns True once a token was taken; with block=False returns
+        False immediately when the bucket is empty.
+        """
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                if not block:
+                    return False
+                # Sleep just long enough for the next token to accrue
+                self._cond.wait((1 - self._tokens) / self.refill_per_sec)
@@ -0,0 +1,148 @@
+import queue
+import smtplib
+import threading
+import time
+
+# Tunables: small bounded pool, recycle connections after enough traffic so
+# we never trip provider per-connection message caps, and reap connections
+# that have sat idle long enough for the server to have dropped them anyway.
+MAX_POOL_SIZE = 5
+MAX_MESSAGES_PER_CONNECTION = 100
+IDLE_TIMEOUT_SECONDS = 100
+REAPER_INTERVAL_SECONDS = 30
+
+class PooledSMTPConnection:
+    """A live SMTP connection plus the bookkeeping the pool needs."""
+
+    def __init__(self, host, port, user=None, password=None, use_tls=True):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+        self._server = None
+        self._connect()
+
+    def _connect(self):
+        self._server = smtplib.SMTP(self.host, self.port)
+        if self.use_tls:
+            self._server.starttls()
+        if self.user and self.password:
+            self._server.login(self.user, self.password)
+
+    def is_alive(self):
+        """Cheap liveness probe; servers silently drop idle connections."""
+        if self._server is None:
+            return False
+        try:
+            status, _ = self._server.noop()
+            return status == 250
+        except Exception:
+            return False
+
+    def send_message(self, msg):
+        try:
+            self._server.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+            self._connect()
+            self._server.send_message(msg)
+        self.messages_sent += 1
+        self.last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+class SMTPPool:
+    """Bounded pool of reusable SMTP connections.
+
+    Usage:
+        conn = pool.acquire()
+        try:
+            conn.send_message(msg)
+        finally:
+            pool.release(conn)
+
+    Connections are validated with NOOP on acquire, recycled after
+    MAX_MESSAGES_PER_CONNECTION sends, and a daemon reaper thread closes
+    connections idle for longer than IDLE_TIMEOUT_SECONDS.
+    """
+
+    def __init__(self, host, port, user=None, password=None, use_tls=True,
+                 max_size=MAX_POOL_SIZE, max_messages=MAX_MESSAGES_PER_CONNECTION,
+                 idle_timeout=IDLE_TIMEOUT_SECONDS):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self._idle = queue.Queue(maxsize=max_size)
+        self._reaper = threading.Thread(target=self._reap_idle, daemon=True)
+        self._reaper.start()
+
+    def acquire(self):
+        """Return a live connection, reusing an idle one when possible."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if conn.is_alive():
+                return conn
+            conn.close()
+        return PooledSMTPConnection(self.host, self.port, self.user,
+                                    self.password, self.use_tls)
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding worn-out ones."""
+        if conn.messages_sent >= self.max_messages:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _reap_idle(self):
+        while True:
+            time.sleep(REAPER_INTERVAL_SECONDS)
+            cutoff = time.monotonic() - self.idle_timeout
+            keep = []
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if conn.last_used < cutoff:
+                    conn.close()
+                else:
+                    keep.append(conn)
+            for conn in keep:
+                try:
+                    self._idle.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+
+# One pool per SMTP endpoint so differently-configured senders don't share
+# authenticated connections.
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_smtp_pool(host, port, user=None, password=None, use_tls=True):
+    key = (host, port, user)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = SMTPPool(host, port, user, password, use_tls)
+                _pools[key] = pool
+    return pool
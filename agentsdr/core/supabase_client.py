@@ -1,38 +1,60 @@
 from supabase import create_client, Client
-from flask import current_app, session
+from flask import current_app, g, has_request_context, session
 import os
+import threading
 from typing import Optional, Dict, Any
 
 class SupabaseManager:
+    """Hands out Supabase clients.
+
+    The user client is auth-mutated per request (set_session with the
+    caller's tokens), so it lives on flask.g - sharing one across threads
+    would leak request A's token into request B under threaded WSGI. The
+    service-role client carries no per-user auth state, so it stays a lazy
+    process-wide singleton and TCP/TLS setup is paid once.
+    """
+
     def __init__(self):
-        self._client: Optional[Client] = None
         self._service_client: Optional[Client] = None
-    
+        self._fallback_client: Optional[Client] = None
+        self._lock = threading.Lock()
+
     def get_client(self) -> Client:
         """Get the Supabase client with user authentication"""
-        if not self._client:
-            self._client = create_client(
+        if not has_request_context():
+            # Outside a request (scripts, workers) there is no user session
+            # to apply, so an unauthenticated shared client is safe
+            if not self._fallback_client:
+                with self._lock:
+                    if not self._fallback_client:
+                        self._fallback_client = create_client(
+                            current_app.config['SUPABASE_URL'],
+                            current_app.config['SUPABASE_ANON_KEY']
+                        )
+            return self._fallback_client
+
+        client = g.get('supabase_client')
+        if client is None:
+            client = create_client(
                 current_app.config['SUPABASE_URL'],
                 current_app.config['SUPABASE_ANON_KEY']
             )
-        
-        # Set auth token if available in session
-        try:
             if 'supabase_token' in session:
-                self._client.auth.set_session(session['supabase_token'], session.get('supabase_refresh_token'))
-        except RuntimeError:
-            # No request context, skip session handling
-            pass
-        
-        return self._client
-    
+                client.auth.set_session(session['supabase_token'], session.get('supabase_refresh_token'))
+            g.supabase_client = client
+
+        return client
+
+
     def get_service_client(self) -> Client:
         """Get the Supabase client with service role key (admin access)"""
         if not self._service_client:
-            self._service_client = create_client(
-                current_app.config['SUPABASE_URL'],
-                current_app.config['SUPABASE_SERVICE_ROLE_KEY']
-            )
+            with self._lock:
+                if not self._service_client:
+                    self._service_client = create_client(
+                        current_app.config['SUPABASE_URL'],
+                        current_app.config['SUPABASE_SERVICE_ROLE_KEY']
+                    )
         return self._service_client
     
     def set_session(self, access_token: str, refresh_token: str = None):
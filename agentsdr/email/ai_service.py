@@ -3,13 +3,55 @@ AI Service for Email Classification and Response Drafting
 InboxAI - Lindy AI-like Email Automation Platform
 """
 
+import asyncio
+import hashlib
+import json
 import os
 import re
+import warnings
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
+from agentsdr.core.cache import cache_get_json, cache_set_json, classification_cache_key
 from agentsdr.email.models import EmailCategory, Sentiment
 
+# Compiled once at import; _parse_draft runs on every generated draft
+_SUBJECT_RE = re.compile(r'Subject:\s*(.+?)\n', re.IGNORECASE)
+_SUBJECT_SUB_RE = re.compile(r'Subject:.+?\n\n?', re.IGNORECASE)
+
+# Token-aware truncation keeps prompt budgets predictable (OpenAI bills
+# and limits by tokens, not characters). The encoder download can fail
+# offline, in which case we fall back to character slicing.
+try:
+    import tiktoken
+    _ENC = tiktoken.encoding_for_model('gpt-4o-mini')
+except Exception:
+    _ENC = None
+
+_CLASSIFY_BODY_TOKENS = 500
+_CLASSIFY_BODY_CHARS = 2000
+_DRAFT_BODY_TOKENS = 375
+_DRAFT_BODY_CHARS = 1500
+
+
+def _truncate_body(body: Optional[str], max_tokens: int, max_chars: int) -> str:
+    """Truncate an email body once, by tokens when the encoder is available"""
+    body = body or ""
+    if _ENC is not None:
+        tokens = _ENC.encode(body)
+        if len(tokens) <= max_tokens:
+            return body
+        return _ENC.decode(tokens[:max_tokens]) + "... [truncated]"
+    if len(body) <= max_chars:
+        return body
+    return body[:max_chars] + "... [truncated]"
+
+
+def collect_stream(gen) -> str:
+    """Concatenate a streamed draft for non-streaming call sites"""
+    return ''.join(gen)
+
 
 class AIService:
     """AI-powered email processing service using OpenAI GPT-4"""
@@ -17,9 +59,18 @@ class AIService:
     def __init__(self):
         """Initialize OpenAI client"""
         self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.model = os.getenv('OPENAI_MODEL', 'gpt-4')
+        self.async_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+        # Per-task models: classification is small structured JSON where a
+        # mini-tier model is fast and cheap; drafts can opt into a larger one
+        self.classification_model = os.getenv('OPENAI_CLASSIFICATION_MODEL', self.model)
+        self.draft_model = os.getenv('OPENAI_DRAFT_MODEL', self.model)
         self.temperature = float(os.getenv('OPENAI_TEMPERATURE', '0.7'))
         self.max_tokens = int(os.getenv('OPENAI_MAX_TOKENS', '2000'))
+        # In-process LRU over classification results; Redis (see
+        # classify_email) covers reuse across processes and restarts
+        self._classification_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._classification_cache_size = 4096
 
     def classify_email(
         self,
@@ -42,6 +93,21 @@ class AIService:
         Returns:
             Classification result dictionary
         """
+        # Identical content always classifies the same way (modulo model and
+        # temperature), so retries and re-processing hit the cache instead of
+        # paying the 1-3s OpenAI round-trip again
+        cache_key = self._content_hash(subject, body, from_email)
+
+        cached = self._classification_cache.get(cache_key)
+        if cached is not None:
+            self._classification_cache.move_to_end(cache_key)
+            return cached
+
+        cached = cache_get_json(classification_cache_key(cache_key))
+        if cached is not None:
+            self._remember_classification(cache_key, cached)
+            return cached
+
         # Prepare classification prompt
         prompt = self._build_classification_prompt(
             subject, body, from_email, user_preferences
@@ -50,54 +116,146 @@ class AIService:
         try:
             # Call OpenAI API
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert email triage assistant. Classify emails as Urgent, FYI, or Archive based on content, sender, and context. Provide confidence scores, reasoning, keywords, sentiment analysis, and actionability."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=self.temperature,
-                max_tokens=1000,
+                model=self.classification_model,
+                messages=self._classification_messages(prompt),
+                temperature=0,
+                max_tokens=300,
                 response_format={"type": "json_object"}
             )
 
-            # Parse response
-            result = eval(response.choices[0].message.content)
-
-            # Structure the classification
-            classification = {
-                "category": result.get("category", "fyi").lower(),
-                "confidence_score": float(result.get("confidence", 0.8)),
-                "reasoning": result.get("reasoning", ""),
-                "priority_score": int(result.get("priority", 50)),
-                "keywords": result.get("keywords", []),
-                "sentiment": result.get("sentiment", "neutral").lower(),
-                "action_required": result.get("action_required", False),
-                "estimated_response_time": result.get("estimated_response_time", ""),
-                "ai_model": self.model,
-                "entities": result.get("entities", {}),
-            }
+            # Parse response; response_format guarantees a JSON object and
+            # json.loads is both safe and far cheaper than eval'ing model output
+            result = json.loads(response.choices[0].message.content)
 
+            classification = self._structure_classification(result)
+            self._remember_classification(cache_key, classification)
+            cache_set_json(classification_cache_key(cache_key), classification, ttl=86400)
             return classification
 
         except Exception as e:
             print(f"Error classifying email: {e}")
-            # Return default classification
-            return {
-                "category": "fyi",
-                "confidence_score": 0.5,
-                "reasoning": f"Classification failed: {str(e)}",
-                "priority_score": 50,
-                "keywords": [],
-                "sentiment": "neutral",
-                "action_required": False,
-                "ai_model": self.model,
+            return self._default_classification(e)
+
+    def _content_hash(self, subject: str, body: str, from_email: str) -> str:
+        """Cache key covering the email content plus model settings."""
+        return hashlib.sha256(
+            f"{self.classification_model}|0|{from_email}|{subject}|{body}".encode()
+        ).hexdigest()
+
+    def _remember_classification(self, cache_key: str, classification: Dict[str, Any]) -> None:
+        self._classification_cache[cache_key] = classification
+        if len(self._classification_cache) > self._classification_cache_size:
+            self._classification_cache.popitem(last=False)
+
+    async def _classify_one(
+        self,
+        email: Dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        """Classify a single email on the async client (see classify_email)"""
+        cache_key = self._content_hash(
+            email.get('subject', ''), email.get('body', ''), email.get('from_email', '')
+        )
+        cached = self._classification_cache.get(cache_key)
+        if cached is None:
+            cached = cache_get_json(classification_cache_key(cache_key))
+        if cached is not None:
+            self._remember_classification(cache_key, cached)
+            return cached
+
+        prompt = self._build_classification_prompt(
+            email.get('subject', ''),
+            email.get('body', ''),
+            email.get('from_email', ''),
+            email.get('user_preferences')
+        )
+
+        try:
+            async with semaphore:
+                response = await self.async_client.chat.completions.create(
+                    model=self.classification_model,
+                    messages=self._classification_messages(prompt),
+                    temperature=0,
+                    max_tokens=300,
+                    response_format={"type": "json_object"}
+                )
+
+            result = json.loads(response.choices[0].message.content)
+            classification = self._structure_classification(result)
+            self._remember_classification(cache_key, classification)
+            cache_set_json(classification_cache_key(cache_key), classification, ttl=86400)
+            return classification
+
+        except Exception as e:
+            print(f"Error classifying email: {e}")
+            return self._default_classification(e)
+
+    async def classify_emails_batch(
+        self,
+        emails: List[Dict[str, Any]],
+        concurrency: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify many emails concurrently
+
+        Runs the classification calls through AsyncOpenAI with a semaphore
+        capping in-flight requests, so a batch of N completes in roughly one
+        round-trip instead of N sequential ones. Sync callers wrap with
+        asyncio.run().
+
+        Args:
+            emails: List of dicts with subject, body, from_email and
+                optional user_preferences keys
+            concurrency: Maximum concurrent OpenAI requests
+
+        Returns:
+            Classification results in the same order as the input
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        return list(await asyncio.gather(
+            *(self._classify_one(email, semaphore) for email in emails)
+        ))
+
+    def _classification_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Chat messages shared by the sync and async classification paths"""
+        return [
+            {
+                "role": "system",
+                "content": "You are an expert email triage assistant. Classify emails as Urgent, FYI, or Archive based on content, sender, and context. Provide confidence scores, reasoning, keywords, sentiment analysis, and actionability."
+            },
+            {
+                "role": "user",
+                "content": prompt
             }
+        ]
+
+    def _structure_classification(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a parsed model response into the classification shape"""
+        return {
+            "category": result.get("category", "fyi").lower(),
+            "confidence_score": float(result.get("confidence", 0.8)),
+            "reasoning": result.get("reasoning", ""),
+            "priority_score": int(result.get("priority", 50)),
+            "keywords": result.get("keywords", []),
+            "sentiment": result.get("sentiment", "neutral").lower(),
+            "action_required": result.get("action_required", False),
+            "estimated_response_time": result.get("estimated_response_time", ""),
+            "ai_model": self.classification_model,
+            "entities": result.get("entities", {}),
+        }
+
+    def _default_classification(self, error: Exception) -> Dict[str, Any]:
+        """Fallback classification when the API call or parsing fails"""
+        return {
+            "category": "fyi",
+            "confidence_score": 0.5,
+            "reasoning": f"Classification failed: {str(error)}",
+            "priority_score": 50,
+            "keywords": [],
+            "sentiment": "neutral",
+            "action_required": False,
+            "ai_model": self.classification_model,
+        }
 
     def _build_classification_prompt(
         self,
@@ -108,11 +266,8 @@ class AIService:
     ) -> str:
         """Build the classification prompt"""
 
-        # Truncate body if too long
-        max_body_length = 2000
-        truncated_body = body[:max_body_length] if body else ""
-        if len(body or "") > max_body_length:
-            truncated_body += "... [truncated]"
+        # Truncate body if too long (single pass, token-aware when possible)
+        truncated_body = _truncate_body(body, _CLASSIFY_BODY_TOKENS, _CLASSIFY_BODY_CHARS)
 
         prompt = f"""Classify this email into one of three categories: Urgent, FYI, or Archive.
 
@@ -184,17 +339,8 @@ Respond in JSON format with:
         try:
             # Call OpenAI API
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are an expert email response writer. Draft {tone} email responses that match the user's writing style. Be concise, clear, and actionable."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                model=self.draft_model,
+                messages=self._draft_messages(prompt, tone),
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
             )
@@ -213,7 +359,7 @@ Respond in JSON format with:
                 "draft_body": draft_body,
                 "tone": tone,
                 "style_match_score": 0.85,  # Placeholder - would calculate from samples
-                "ai_model": self.model,
+                "ai_model": self.draft_model,
                 "tokens_used": tokens_used,
             }
 
@@ -225,10 +371,70 @@ Respond in JSON format with:
                 "draft_subject": f"Re: {subject}",
                 "draft_body": f"Error generating draft: {str(e)}",
                 "tone": tone,
-                "ai_model": self.model,
+                "ai_model": self.draft_model,
                 "tokens_used": 0,
             }
 
+    def draft_response_stream(
+        self,
+        subject: str,
+        body: str,
+        from_email: str,
+        user_id: str,
+        tone: str = "professional",
+        key_points: Optional[List[str]] = None,
+        custom_instructions: Optional[str] = None,
+        user_writing_samples: Optional[List[str]] = None
+    ):
+        """
+        Stream a draft response as it is generated
+
+        Yields content deltas as OpenAI produces them, so UI-facing callers
+        can render the draft progressively instead of waiting seconds for
+        the full completion (e.g. via Response(stream_with_context(gen),
+        mimetype='text/event-stream')). Use collect_stream() to buffer the
+        whole draft on non-streaming paths.
+
+        Args mirror draft_response.
+
+        Yields:
+            Text fragments of the draft, in order
+        """
+        prompt = self._build_draft_prompt(
+            subject, body, from_email, tone, key_points,
+            custom_instructions, user_writing_samples
+        )
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.draft_model,
+                messages=self._draft_messages(prompt, tone),
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True,
+            )
+
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            print(f"Error streaming draft: {e}")
+            yield f"Error generating draft: {str(e)}"
+
+    def _draft_messages(self, prompt: str, tone: str) -> List[Dict[str, str]]:
+        """Chat messages shared by the buffered and streaming draft paths"""
+        return [
+            {
+                "role": "system",
+                "content": f"You are an expert email response writer. Draft {tone} email responses that match the user's writing style. Be concise, clear, and actionable."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
     def _build_draft_prompt(
         self,
         subject: str,
@@ -241,11 +447,8 @@ Respond in JSON format with:
     ) -> str:
         """Build the draft response prompt"""
 
-        # Truncate body if too long
-        max_body_length = 1500
-        truncated_body = body[:max_body_length] if body else ""
-        if len(body or "") > max_body_length:
-            truncated_body += "... [truncated]"
+        # Truncate body if too long (single pass, token-aware when possible)
+        truncated_body = _truncate_body(body, _DRAFT_BODY_TOKENS, _DRAFT_BODY_CHARS)
 
         prompt = f"""Draft a {tone} email response to the following email:
 
@@ -291,87 +494,88 @@ Subject: [proposed subject line]
         """Parse draft text to extract subject and body"""
 
         # Try to extract subject line
-        subject_match = re.search(r'Subject:\s*(.+?)\n', draft_text, re.IGNORECASE)
+        subject_match = _SUBJECT_RE.search(draft_text)
 
         if subject_match:
             draft_subject = subject_match.group(1).strip()
             # Remove subject line from body
-            draft_body = re.sub(r'Subject:.+?\n\n?', '', draft_text, count=1, flags=re.IGNORECASE).strip()
+            draft_body = _SUBJECT_SUB_RE.sub('', draft_text, count=1).strip()
         else:
             draft_subject = f"Re: {original_subject}"
             draft_body = draft_text.strip()
 
         return draft_subject, draft_body
 
-    def analyze_sentiment(self, text: str) -> str:
+    def analyze_email(
+        self,
+        subject: str,
+        body: str,
+        from_email: str = "",
+        user_id: str = "",
+        user_preferences: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
-        Analyze sentiment of text
+        Run the full email analysis (category, sentiment, entities, keywords)
+
+        The classification prompt already returns all of these in one LLM
+        round-trip, so callers needing several facets should use this once
+        instead of issuing per-facet API calls. classify_email caches by
+        content hash, so repeated calls for the same email are free.
 
         Args:
-            text: Text to analyze
+            subject: Email subject
+            body: Email body (plain text)
+            from_email: Sender email address
+            user_id: User ID for personalization
+            user_preferences: Optional user classification preferences
 
         Returns:
-            Sentiment: positive, neutral, or negative
+            Classification result dictionary (see classify_email)
         """
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Analyze the sentiment of the text. Respond with only one word: positive, neutral, or negative."
-                    },
-                    {
-                        "role": "user",
-                        "content": text[:500]  # Limit to 500 chars
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=10,
-            )
+        return self.classify_email(subject, body, from_email, user_id, user_preferences)
 
-            sentiment = response.choices[0].message.content.strip().lower()
+    def analyze_sentiment(self, text: str) -> str:
+        """
+        Analyze sentiment of text
 
-            if sentiment in ["positive", "neutral", "negative"]:
-                return sentiment
+        Deprecated: use analyze_email(), which returns sentiment alongside
+        the other facets for the same single API call.
 
-            return "neutral"
+        Args:
+            text: Text to analyze
 
-        except Exception as e:
-            print(f"Error analyzing sentiment: {e}")
-            return "neutral"
+        Returns:
+            Sentiment: positive, neutral, or negative
+        """
+        warnings.warn(
+            "analyze_sentiment is deprecated; use analyze_email() instead",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        sentiment = self.analyze_email("", text).get("sentiment", "neutral")
+        return sentiment if sentiment in ["positive", "neutral", "negative"] else "neutral"
 
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """
         Extract entities from text (people, organizations, dates)
 
+        Deprecated: use analyze_email(), which returns entities alongside
+        the other facets for the same single API call.
+
         Args:
             text: Text to analyze
 
         Returns:
             Dictionary of entities
         """
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Extract people, organizations, and dates from the text. Return as JSON: {\"people\": [], \"organizations\": [], \"dates\": []}"
-                    },
-                    {
-                        "role": "user",
-                        "content": text[:1000]  # Limit to 1000 chars
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=200,
-                response_format={"type": "json_object"}
-            )
-
-            entities = eval(response.choices[0].message.content)
-            return entities
-
-        except Exception as e:
-            print(f"Error extracting entities: {e}")
-            return {"people": [], "organizations": [], "dates": []}
+        warnings.warn(
+            "extract_entities is deprecated; use analyze_email() instead",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        entities = self.analyze_email("", text).get("entities") or {}
+        return {
+            "people": entities.get("people", []),
+            "organizations": entities.get("organizations", []),
+            "dates": entities.get("dates", []),
+        }
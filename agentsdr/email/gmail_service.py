@@ -6,11 +6,25 @@ InboxAI - Lindy AI-like Email Automation Platform
 import os
 import base64
 import email
+import hashlib
+import re
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import RLock, local
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
+from email.utils import getaddresses, parsedate_to_datetime as _parse_rfc2822
+from functools import lru_cache
 
+import asyncio
+
+import aiohttp
+import google_auth_httplib2
+import httplib2
+from cachetools import TTLCache
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
@@ -20,6 +34,82 @@ from googleapiclient.errors import HttpError
 from bs4 import BeautifulSoup
 import email_reply_parser
 
+from agentsdr.email.models import Email, ParsedEmail
+
+try:
+    # ~50x faster than html.parser for the HTML->text hot path
+    from selectolax.parser import HTMLParser as _SelectolaxHTMLParser
+except ImportError:
+    _SelectolaxHTMLParser = None
+
+# Workflow re-runs and classification retries touch the same messages
+# repeatedly; 15 minutes of reuse turns an HTTPS round trip plus a full
+# base64/MIME parse into a dict lookup. Keys are scoped per account so
+# two connected mailboxes never see each other's messages.
+_EMAIL_CACHE = TTLCache(maxsize=10_000, ttl=900)
+# Parsed payloads keyed by (account, id, historyId): a re-fetch whose
+# historyId hasn't moved skips the parse entirely.
+_PARSE_CACHE = TTLCache(maxsize=10_000, ttl=900)
+_CACHE_LOCK = RLock()
+
+# Shared pool for blocking googleapiclient calls: lets async handlers
+# push fetches off the event loop and gives the non-batch fallback true
+# parallelism. Threads spawn lazily, so an idle pool costs nothing.
+_FETCH_POOL = ThreadPoolExecutor(max_workers=10, thread_name_prefix='gmail-io')
+
+# URL-safe -> standard base64 alphabet; translate + one b64decode call is
+# cheaper than urlsafe_b64decode's per-part Python overhead when parsing
+# many small MIME parts.
+_URLSAFE_TRANS = bytes.maketrans(b'-_', b'+/')
+
+# The only headers _parse_email reads; real messages carry 20-60 more
+# (Received chains, DKIM/ARC, X-*) that aren't worth a dict entry each.
+WANTED_HEADERS = frozenset({'subject', 'from', 'to', 'cc', 'bcc', 'date'})
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_cached(date_str: str):
+    """Parse an RFC 2822 date, memoized for repeated identical headers
+
+    Threads quote the original message, so the same Date string shows up
+    over and over; the cache turns the re-parse into a dict hit.
+    """
+    try:
+        return _parse_rfc2822(date_str)
+    except Exception:
+        return None
+
+
+def _decode_b64url(data: str) -> bytes:
+    """Decode Gmail's URL-safe base64, tolerating missing padding"""
+    raw = data.encode('ascii').translate(_URLSAFE_TRANS)
+    pad = -len(raw) % 4
+    if pad:
+        raw += b'=' * pad
+    return base64.b64decode(raw)
+
+
+_WS_RUN_RE = re.compile(r'\s+')
+
+
+def _html_to_text(html: bytes) -> str:
+    """Convert an HTML body to plain text with the fastest parser available
+
+    Marketing emails make HTML->text a per-message hot spot; selectolax
+    (C extension) beats BeautifulSoup's pure-Python html.parser by an
+    order of magnitude, with lxml as the middle fallback. Takes bytes so
+    the parser does the one and only decode.
+    """
+    if _SelectolaxHTMLParser is not None:
+        body = _SelectolaxHTMLParser(html).body
+        text = body.text(separator=' ', strip=True) if body is not None else ''
+        return _WS_RUN_RE.sub(' ', text).strip()
+    try:
+        soup = BeautifulSoup(html, 'lxml')
+    except Exception:
+        soup = BeautifulSoup(html, 'html.parser')
+    return _WS_RUN_RE.sub(' ', soup.get_text(separator=' ')).strip()
+
 
 class GmailService:
     """Gmail API service for fetching and sending emails"""
@@ -39,9 +129,21 @@ class GmailService:
         """
         self.credentials = credentials
         self.service = None
+        # Per-thread services for the threaded fetch fallback (see
+        # _service_for_thread)
+        self._thread_services = local()
+        self._cache_scope = self._account_cache_scope(credentials)
         if credentials:
             self._build_service()
 
+    @staticmethod
+    def _account_cache_scope(credentials: Optional[Dict[str, Any]]) -> str:
+        """Stable per-account prefix for the shared message caches"""
+        raw = ''
+        if credentials:
+            raw = credentials.get('refresh_token') or credentials.get('token') or ''
+        return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
     def _build_service(self):
         """Build Gmail API service"""
         try:
@@ -49,16 +151,53 @@ class GmailService:
                 self.credentials,
                 self.SCOPES
             )
-            self.service = build('gmail', 'v1', credentials=creds)
+            # One keepalive Http per service instance: TCP/TLS is reused
+            # across this instance's calls instead of a fresh handshake
+            # per request (httplib2.Http is not thread-safe, so it isn't
+            # shared wider). cache_discovery=False skips the discovery
+            # file-cache import and lock; googleapiclient already
+            # negotiates gzip on responses.
+            http = google_auth_httplib2.AuthorizedHttp(
+                creds, http=httplib2.Http(timeout=30)
+            )
+            self.service = build('gmail', 'v1', http=http, cache_discovery=False)
         except Exception as e:
             print(f"Error building Gmail service: {e}")
             raise
 
+    def _service_for_thread(self):
+        """Per-thread service for the threaded fetch fallback
+
+        self.service rides on a single httplib2.Http, which is not
+        thread-safe (see _build_service) - concurrent requests over it
+        corrupt connections and responses. Each pool worker builds its
+        own AuthorizedHttp once here and reuses it across that thread's
+        fetches.
+        """
+        service = getattr(self._thread_services, 'service', None)
+        if service is None:
+            creds = Credentials.from_authorized_user_info(
+                self.credentials,
+                self.SCOPES
+            )
+            http = google_auth_httplib2.AuthorizedHttp(
+                creds, http=httplib2.Http(timeout=30)
+            )
+            service = build('gmail', 'v1', http=http, cache_discovery=False)
+            self._thread_services.service = service
+        return service
+
+    # Headers worth shipping when the caller only needs metadata
+    METADATA_HEADERS = ['Subject', 'From', 'To', 'Cc', 'Date']
+    # Partial-response filter: trims the JSON down to what _parse_email reads
+    METADATA_FIELDS = 'id,threadId,historyId,labelIds,payload/headers'
+
     def fetch_emails(
         self,
         max_results: int = 50,
         query: str = None,
-        after_date: Optional[datetime] = None
+        after_date: Optional[datetime] = None,
+        include_body: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Fetch emails from Gmail
@@ -67,6 +206,9 @@ class GmailService:
             max_results: Maximum number of emails to fetch
             query: Gmail search query
             after_date: Fetch emails after this date
+            include_body: Fetch full bodies; pass False for
+                classification/triage flows that only read headers, which
+                skips the base64 body transfer and decode entirely
 
         Returns:
             List of parsed email dictionaries
@@ -95,180 +237,424 @@ class GmailService:
             if not messages:
                 return []
 
-            # Fetch full message details
-            emails = []
-            for msg in messages:
-                try:
-                    email_data = self._fetch_email_by_id(msg['id'])
-                    if email_data:
-                        emails.append(email_data)
-                except Exception as e:
-                    print(f"Error fetching email {msg['id']}: {e}")
-                    continue
+            # Fetch full message details in batch requests instead of one
+            # round trip per message
+            return self._fetch_emails_batch(
+                [msg['id'] for msg in messages], include_body=include_body
+            )
+
+        except HttpError as error:
+            print(f"Gmail API error: {error}")
+            raise
 
-            return emails
+    def iter_emails(
+        self,
+        max_results: int = 50,
+        query: str = None,
+        after_date: Optional[datetime] = None,
+        include_body: bool = True
+    ):
+        """
+        Yield parsed emails as each batch round trip completes
+
+        Generator counterpart to fetch_emails: instead of buffering the
+        whole result, messages are yielded one BATCH_SIZE round trip at a
+        time, so callers can overlap their own I/O (e.g. database
+        inserts) with the next Gmail batch.
+
+        Args:
+            max_results: Maximum number of emails to fetch
+            query: Gmail search query
+            after_date: Fetch emails after this date
+            include_body: Fetch full bodies (see fetch_emails)
+
+        Yields:
+            Parsed email dictionaries
+        """
+        if not self.service:
+            raise ValueError("Gmail service not initialized")
+
+        try:
+            if not query:
+                query = "in:inbox"
+
+            if after_date:
+                date_str = after_date.strftime("%Y/%m/%d")
+                query = f"{query} after:{date_str}"
+
+            results = self.service.users().messages().list(
+                userId='me',
+                q=query,
+                maxResults=max_results
+            ).execute()
+
+            message_ids = [msg['id'] for msg in results.get('messages', [])]
+
+            for start in range(0, len(message_ids), self.BATCH_SIZE):
+                yield from self._fetch_emails_batch(
+                    message_ids[start:start + self.BATCH_SIZE],
+                    include_body=include_body
+                )
 
         except HttpError as error:
             print(f"Gmail API error: {error}")
             raise
 
-    def _fetch_email_by_id(self, message_id: str) -> Optional[Dict[str, Any]]:
+    def fetch_incremental(self, start_history_id: str,
+                          include_body: bool = True) -> tuple:
         """
-        Fetch a single email by ID and parse it
+        Fetch only messages added since a previous sync point
+
+        users.history.list returns deltas since start_history_id in
+        O(changes) instead of re-scanning the whole inbox with a dated
+        search on every poll. Callers persist the returned history id per
+        user and pass it back on the next poll.
 
         Args:
-            message_id: Gmail message ID
+            start_history_id: historyId from the previous sync
+            include_body: Forwarded to the batch fetch
 
         Returns:
-            Parsed email dictionary
+            Tuple of (emails, new_history_id). When the history window
+            has expired (Gmail 404), falls back to a full fetch_emails
+            and re-seeds the cursor from the user's profile.
         """
+        if not self.service:
+            raise ValueError("Gmail service not initialized")
+
         try:
-            message = self.service.users().messages().get(
+            message_ids = []
+            new_history_id = start_history_id
+            page_token = None
+            while True:
+                request = self.service.users().history().list(
+                    userId='me',
+                    startHistoryId=start_history_id,
+                    historyTypes=['messageAdded'],
+                    pageToken=page_token
+                )
+                results = request.execute()
+                new_history_id = results.get('historyId', new_history_id)
+                for record in results.get('history', ()):
+                    for added in record.get('messagesAdded', ()):
+                        message_ids.append(added['message']['id'])
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
+
+            emails = self._fetch_emails_batch(message_ids, include_body=include_body) \
+                if message_ids else []
+            return emails, new_history_id
+
+        except HttpError as error:
+            if error.resp.status == 404:
+                # History expired: full resync and a fresh cursor
+                print("Gmail history expired, falling back to full fetch")
+                emails = self.fetch_emails(include_body=include_body)
+                profile = self.service.users().getProfile(userId='me').execute()
+                return emails, profile.get('historyId')
+            print(f"Gmail API error: {error}")
+            raise
+
+    # Gmail's documented cap on requests per batch HTTP call
+    BATCH_SIZE = 100
+
+    def _message_request(self, message_id: str, include_body: bool,
+                         service=None):
+        """Build a messages.get request, metadata-only when the body isn't needed
+
+        format='metadata' spares Gmail from serializing the base64 body -
+        usually the largest field - and the fields filter trims the JSON
+        to what _parse_email actually reads. service overrides
+        self.service for callers holding a per-thread instance.
+        """
+        service = service or self.service
+        if include_body:
+            return service.users().messages().get(
                 userId='me',
                 id=message_id,
                 format='full'
-            ).execute()
+            )
+        return service.users().messages().get(
+            userId='me',
+            id=message_id,
+            format='metadata',
+            metadataHeaders=self.METADATA_HEADERS,
+            fields=self.METADATA_FIELDS
+        )
+
+    def _fetch_emails_batch(self, message_ids: List[str],
+                            include_body: bool = True) -> List[Dict[str, Any]]:
+        """
+        Fetch multiple emails with the Gmail batch HTTP endpoint
 
-            return self._parse_email(message)
+        One batch call replaces up to BATCH_SIZE sequential GET round
+        trips, which dominate fetch latency. Failed sub-requests are
+        logged and skipped, matching the old per-message behavior.
+
+        Args:
+            message_ids: Gmail message IDs to fetch
+
+        Returns:
+            List of parsed email dictionaries in the original ID order
+        """
+        parsed = {}
+        missing = []
+        with _CACHE_LOCK:
+            for mid in message_ids:
+                cached = _EMAIL_CACHE.get((self._cache_scope, mid, include_body))
+                if cached is not None:
+                    parsed[mid] = cached
+                else:
+                    missing.append(mid)
+
+        def _on_message(request_id, response, exception):
+            if exception is not None:
+                print(f"Error fetching email {request_id}: {exception}")
+                return
+            email_data = self._parse_email(response)
+            if email_data:
+                parsed[request_id] = email_data
+                with _CACHE_LOCK:
+                    _EMAIL_CACHE[(self._cache_scope, request_id, include_body)] = email_data
+
+        try:
+            for start in range(0, len(missing), self.BATCH_SIZE):
+                batch = self.service.new_batch_http_request(callback=_on_message)
+                for mid in missing[start:start + self.BATCH_SIZE]:
+                    batch.add(
+                        self._message_request(mid, include_body),
+                        request_id=mid
+                    )
+                batch.execute()
+        except HttpError as error:
+            # Batch endpoint unavailable: fall back to parallel single GETs
+            print(f"Gmail batch fetch failed, falling back to threaded fetch: {error}")
+            parsed.update(self._fetch_emails_threaded(missing, include_body=include_body))
+
+        return [parsed[mid] for mid in message_ids if mid in parsed]
+
+    def _fetch_emails_threaded(self, message_ids: List[str],
+                               include_body: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Fallback: fetch messages concurrently via individual GETs
+
+        Each worker fetches over its own per-thread service - the shared
+        self.service must not be used concurrently (httplib2.Http is not
+        thread-safe).
+        """
+        results = _FETCH_POOL.map(
+            lambda mid: self._fetch_email_by_id(
+                mid, include_body=include_body,
+                service=self._service_for_thread()
+            ),
+            message_ids
+        )
+        return {
+            mid: email_data
+            for mid, email_data in zip(message_ids, results)
+            if email_data
+        }
+
+    async def fetch_emails_async(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        """Run fetch_emails on the shared pool without blocking the event loop
+
+        googleapiclient's HTTP transport is synchronous; calling
+        fetch_emails directly from a coroutine would freeze every other
+        task on the loop for the duration of the network wait.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            _FETCH_POOL, partial(self.fetch_emails, *args, **kwargs)
+        )
+
+    def _fetch_email_by_id(self, message_id: str, *,
+                           include_body: bool = True,
+                           service=None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single email by ID and parse it
+
+        Args:
+            message_id: Gmail message ID
+            include_body: When False, request only metadata headers
+            service: Gmail service to fetch over (defaults to
+                self.service; threaded callers pass a per-thread one)
+
+        Returns:
+            Parsed email dictionary
+        """
+        cache_key = (self._cache_scope, message_id, include_body)
+        with _CACHE_LOCK:
+            cached = _EMAIL_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            message = self._message_request(message_id, include_body,
+                                            service=service).execute()
+
+            email_data = self._parse_email(message)
+            if email_data:
+                with _CACHE_LOCK:
+                    _EMAIL_CACHE[cache_key] = email_data
+            return email_data
 
         except HttpError as error:
             print(f"Error fetching email {message_id}: {error}")
             return None
 
-    def _parse_email(self, message: Dict[str, Any]) -> Dict[str, Any]:
+    def invalidate(self, message_id: str) -> None:
+        """Drop a message from the caches after a state-changing operation"""
+        with _CACHE_LOCK:
+            for include_body in (True, False):
+                _EMAIL_CACHE.pop((self._cache_scope, message_id, include_body), None)
+
+    def _parse_email(self, message: Dict[str, Any], *,
+                     keep_raw: bool = False) -> ParsedEmail:
         """
         Parse Gmail message into structured format
 
         Args:
             message: Raw Gmail message
+            keep_raw: Retain the full Gmail JSON in raw_data.
+                Off by default - the raw payload roughly doubles each
+                email's memory footprint and almost no caller reads it.
 
         Returns:
-            Parsed email dictionary
+            ParsedEmail instance
         """
-        headers = {h['name']: h['value'] for h in message['payload']['headers']}
-
-        # Extract basic info
-        email_data = {
-            'gmail_message_id': message['id'],
-            'gmail_thread_id': message['threadId'],
-            'subject': headers.get('Subject', ''),
-            'from_email': self._extract_email(headers.get('From', '')),
-            'from_name': self._extract_name(headers.get('From', '')),
-            'to_email': self._extract_email(headers.get('To', '')),
-            'cc_emails': self._parse_email_list(headers.get('Cc', '')),
-            'bcc_emails': self._parse_email_list(headers.get('Bcc', '')),
-            'received_at': self._parse_date(headers.get('Date', '')),
-            'labels': message.get('labelIds', []),
-            'is_read': 'UNREAD' not in message.get('labelIds', []),
-            'is_starred': 'STARRED' in message.get('labelIds', []),
-            'raw_data': message,
-        }
-
-        # Extract body
-        body_plain, body_html = self._extract_body(message['payload'])
-        email_data['body_plain'] = body_plain
-        email_data['body_html'] = body_html
-
-        # Check for attachments
-        email_data['has_attachments'] = self._has_attachments(message['payload'])
-        email_data['attachment_count'] = self._count_attachments(message['payload'])
+        history_id = message.get('historyId')
+        parse_key = None
+        if history_id:
+            parse_key = (self._cache_scope, message['id'], history_id, keep_raw)
+            with _CACHE_LOCK:
+                cached = _PARSE_CACHE.get(parse_key)
+            if cached is not None:
+                return cached
+
+        # Pick only the headers we read instead of building a dict over
+        # the full header block
+        headers = {}
+        for h in message['payload']['headers']:
+            name = h['name'].lower()
+            if name in WANTED_HEADERS:
+                headers[name] = h['value']
+
+        from_pairs = self._parse_addresses(headers.get('from', ''))
+        from_name, from_email = from_pairs[0] if from_pairs else ('', '')
+        to_pairs = self._parse_addresses(headers.get('to', ''))
+
+        # Fast path: most transactional mail is a single text part with
+        # no attachments - decode it inline and skip the tree walk
+        payload = message['payload']
+        mime_type = payload.get('mimeType')
+        if mime_type in ('text/plain', 'text/html') and not payload.get('parts'):
+            data = payload.get('body', {}).get('data')
+            raw = _decode_b64url(data) if data else None
+            if mime_type == 'text/plain':
+                body_plain = raw.decode('utf-8') if raw is not None else None
+                html_bytes = None
+            else:
+                html_bytes = raw
+                body_plain = _html_to_text(raw) if raw is not None else None
+            attachment_count = 0
+        else:
+            # General multipart path: one fused tree walk for bodies and
+            # attachment count
+            body_plain, html_bytes, attachment_count = self._walk_payload(payload)
+        # HTML is stored compressed - it's often the largest field by far
+
+        labels = message.get('labelIds', [])
+        email_data = ParsedEmail(
+            gmail_message_id=message['id'],
+            gmail_thread_id=message['threadId'],
+            subject=headers.get('subject', ''),
+            from_email=from_email,
+            from_name=from_name,
+            to_email=to_pairs[0][1] if to_pairs else '',
+            cc_emails=[addr for _, addr in self._parse_addresses(headers.get('cc', ''))],
+            bcc_emails=[addr for _, addr in self._parse_addresses(headers.get('bcc', ''))],
+            received_at=self._parse_date(headers.get('date', '')),
+            labels=labels,
+            is_read='UNREAD' not in labels,
+            is_starred='STARRED' in labels,
+            body_plain=body_plain,
+            body_html=Email.compress_text(html_bytes) if html_bytes else None,
+            has_attachments=attachment_count > 0,
+            attachment_count=attachment_count,
+            raw_data=Email.compress_raw(message) if keep_raw else None,
+        )
+
+        if parse_key:
+            with _CACHE_LOCK:
+                _PARSE_CACHE[parse_key] = email_data
 
         return email_data
 
-    def _extract_body(self, payload: Dict[str, Any]) -> tuple:
+    def _walk_payload(self, payload: Dict[str, Any]) -> tuple:
         """
-        Extract plain text and HTML body from email payload
+        Extract bodies and count attachments in one MIME-tree traversal
+
+        _extract_body and the attachment walk each visited every part;
+        fusing them into a single iterative pass does the same work with
+        one traversal. Blobs stay bytes until exactly one decode is
+        needed.
 
         Args:
             payload: Email payload
 
         Returns:
-            Tuple of (plain_text, html)
+            Tuple of (plain_text, html_bytes, attachment_count)
         """
-        plain_text = None
-        html = None
+        plain_bytes = None
+        html_bytes = None
+        attachment_count = 0
 
         if 'body' in payload and payload['body'].get('data'):
-            # Simple email body
-            data = payload['body']['data']
-            text = base64.urlsafe_b64decode(data).decode('utf-8')
-            plain_text = text
-        elif 'parts' in payload:
-            # Multipart email
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    if part['body'].get('data'):
-                        data = part['body']['data']
-                        plain_text = base64.urlsafe_b64decode(data).decode('utf-8')
-                elif part['mimeType'] == 'text/html':
-                    if part['body'].get('data'):
-                        data = part['body']['data']
-                        html = base64.urlsafe_b64decode(data).decode('utf-8')
-                elif 'parts' in part:
-                    # Nested parts
-                    p_text, p_html = self._extract_body(part)
-                    if not plain_text:
-                        plain_text = p_text
-                    if not html:
-                        html = p_html
-
-        # If we only have HTML, convert to plain text
-        if not plain_text and html:
-            soup = BeautifulSoup(html, 'html.parser')
-            plain_text = soup.get_text()
-
-        return plain_text, html
-
-    def _extract_email(self, email_str: str) -> str:
-        """Extract email address from string like 'Name <email@example.com>'"""
-        if '<' in email_str and '>' in email_str:
-            return email_str[email_str.find('<') + 1:email_str.find('>')]
-        return email_str.strip()
-
-    def _extract_name(self, email_str: str) -> str:
-        """Extract name from string like 'Name <email@example.com>'"""
-        if '<' in email_str:
-            return email_str[:email_str.find('<')].strip().strip('"')
-        return ''
-
-    def _parse_email_list(self, email_list_str: str) -> List[str]:
-        """Parse comma-separated email list"""
-        if not email_list_str:
+            # Simple (non-multipart) email body
+            plain_bytes = _decode_b64url(payload['body']['data'])
+        else:
+            queue = deque(payload.get('parts', ()))
+            while queue:
+                part = queue.popleft()
+                if part.get('filename'):
+                    attachment_count += 1
+                    continue
+                mime_type = part.get('mimeType')
+                data = part.get('body', {}).get('data')
+                if mime_type == 'text/plain' and data:
+                    plain_bytes = _decode_b64url(data)
+                elif mime_type == 'text/html' and data:
+                    html_bytes = _decode_b64url(data)
+                else:
+                    queue.extend(part.get('parts', ()))
+
+        plain_text = plain_bytes.decode('utf-8') if plain_bytes is not None else None
+
+        # If we only have HTML, convert to plain text; the parser
+        # consumes the bytes directly, avoiding a second decode
+        if not plain_text and html_bytes:
+            plain_text = _html_to_text(html_bytes)
+
+        return plain_text, html_bytes, attachment_count
+
+    @staticmethod
+    def _parse_addresses(header: str) -> List[tuple]:
+        """Parse an address header into [(name, addr), ...] pairs
+
+        getaddresses handles quoted display names like '"Doe, John"
+        <j@x>' correctly, which the old find/split scans did not, and
+        tokenizes the whole header in one pass.
+        """
+        if not header:
             return []
-        emails = []
-        for email_str in email_list_str.split(','):
-            emails.append(self._extract_email(email_str))
-        return emails
+        return getaddresses([header])
 
     def _parse_date(self, date_str: str) -> datetime:
         """Parse email date string to datetime"""
-        try:
-            from email.utils import parsedate_to_datetime
-            return parsedate_to_datetime(date_str)
-        except Exception:
-            return datetime.now()
-
-    def _has_attachments(self, payload: Dict[str, Any]) -> bool:
-        """Check if email has attachments"""
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part.get('filename'):
-                    return True
-                if 'parts' in part:
-                    if self._has_attachments(part):
-                        return True
-        return False
+        return _parse_date_cached(date_str) or datetime.now()
 
     def _count_attachments(self, payload: Dict[str, Any]) -> int:
-        """Count number of attachments"""
-        count = 0
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part.get('filename'):
-                    count += 1
-                if 'parts' in part:
-                    count += self._count_attachments(part)
-        return count
+        """Count number of attachments (thin wrapper over _walk_payload)"""
+        return self._walk_payload(payload)[2]
 
     def send_email(
         self,
@@ -301,25 +687,28 @@ class GmailService:
             raise ValueError("Gmail service not initialized")
 
         try:
-            # Create message
-            message = MIMEMultipart() if html else MIMEText(body)
-
-            if html:
-                message.attach(MIMEText(body, 'html'))
-
-            message['to'] = to
-            message['subject'] = subject
+            # Create message; EmailMessage serializes once with correct
+            # transfer encoding, instead of the MIMEMultipart build +
+            # as_bytes + re-encode copy chain
+            message = EmailMessage()
+            message['To'] = to
+            message['Subject'] = subject
 
             if cc:
-                message['cc'] = ', '.join(cc)
+                message['Cc'] = ', '.join(cc)
             if bcc:
-                message['bcc'] = ', '.join(bcc)
+                message['Bcc'] = ', '.join(bcc)
             if in_reply_to:
                 message['In-Reply-To'] = in_reply_to
                 message['References'] = in_reply_to
 
+            if html:
+                message.set_content(body, subtype='html')
+            else:
+                message.set_content(body)
+
             # Encode message
-            raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
+            raw = base64.urlsafe_b64encode(bytes(message)).decode()
 
             # Send message
             send_body = {'raw': raw}
@@ -337,44 +726,78 @@ class GmailService:
             print(f"Error sending email: {error}")
             raise
 
-    def mark_as_read(self, message_id: str) -> bool:
-        """Mark email as read"""
+    # Gmail's documented cap on ids per batchModify call
+    BATCH_MODIFY_SIZE = 1000
+
+    def _batch_modify(self, message_ids: List[str],
+                      add: Optional[List[str]] = None,
+                      remove: Optional[List[str]] = None) -> bool:
+        """Apply one label change to many messages via batchModify
+
+        One HTTPS call per 1000 ids instead of one per message - marking
+        a workflow's 100 matches as read collapses 100 round trips into
+        one.
+        """
+        if not message_ids:
+            return True
+        body = {}
+        if add:
+            body['addLabelIds'] = add
+        if remove:
+            body['removeLabelIds'] = remove
         try:
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body={'removeLabelIds': ['UNREAD']}
-            ).execute()
+            for start in range(0, len(message_ids), self.BATCH_MODIFY_SIZE):
+                chunk = message_ids[start:start + self.BATCH_MODIFY_SIZE]
+                self.service.users().messages().batchModify(
+                    userId='me',
+                    body=dict(body, ids=chunk)
+                ).execute()
+            for mid in message_ids:
+                self.invalidate(mid)
             return True
         except HttpError as error:
-            print(f"Error marking email as read: {error}")
+            print(f"Error batch-modifying emails: {error}")
             return False
 
+    def mark_as_read_bulk(self, message_ids: List[str]) -> bool:
+        """Mark many emails as read in one batchModify call"""
+        return self._batch_modify(message_ids, remove=['UNREAD'])
+
+    def archive_bulk(self, message_ids: List[str]) -> bool:
+        """Archive many emails (remove from inbox) in one batchModify call"""
+        return self._batch_modify(message_ids, remove=['INBOX'])
+
+    def star_bulk(self, message_ids: List[str]) -> bool:
+        """Star many emails in one batchModify call"""
+        return self._batch_modify(message_ids, add=['STARRED'])
+
+    def add_label_bulk(self, message_ids: List[str], label_id: str) -> bool:
+        """Add a label to many emails in one batchModify call"""
+        return self._batch_modify(message_ids, add=[label_id])
+
+    def mark_as_read(self, message_id: str) -> bool:
+        """Mark email as read (prefer mark_as_read_bulk for many ids)"""
+        warnings.warn(
+            "mark_as_read is one round trip per message; use mark_as_read_bulk",
+            DeprecationWarning, stacklevel=2
+        )
+        return self.mark_as_read_bulk([message_id])
+
     def archive_email(self, message_id: str) -> bool:
-        """Archive email (remove from inbox)"""
-        try:
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body={'removeLabelIds': ['INBOX']}
-            ).execute()
-            return True
-        except HttpError as error:
-            print(f"Error archiving email: {error}")
-            return False
+        """Archive email (prefer archive_bulk for many ids)"""
+        warnings.warn(
+            "archive_email is one round trip per message; use archive_bulk",
+            DeprecationWarning, stacklevel=2
+        )
+        return self.archive_bulk([message_id])
 
     def star_email(self, message_id: str) -> bool:
-        """Star an email"""
-        try:
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body={'addLabelIds': ['STARRED']}
-            ).execute()
-            return True
-        except HttpError as error:
-            print(f"Error starring email: {error}")
-            return False
+        """Star an email (prefer star_bulk for many ids)"""
+        warnings.warn(
+            "star_email is one round trip per message; use star_bulk",
+            DeprecationWarning, stacklevel=2
+        )
+        return self.star_bulk([message_id])
 
     def create_label(self, label_name: str) -> Optional[str]:
         """
@@ -401,14 +824,166 @@ class GmailService:
             return None
 
     def add_label(self, message_id: str, label_id: str) -> bool:
-        """Add label to email"""
+        """Add label to email (prefer add_label_bulk for many ids)"""
+        warnings.warn(
+            "add_label is one round trip per message; use add_label_bulk",
+            DeprecationWarning, stacklevel=2
+        )
+        return self.add_label_bulk([message_id], label_id)
+
+
+class AsyncGmailService(GmailService):
+    """Async Gmail client for network-bound bulk operations
+
+    Talks to the Gmail REST API directly over a shared
+    aiohttp.ClientSession with an OAuth bearer header, so message fetches
+    and label modifications for a whole batch run concurrently instead of
+    one blocking round trip each. A semaphore caps in-flight requests to
+    stay inside Gmail's per-user quota. Inherits the parsing helpers from
+    GmailService; sync callers can use the fetch_emails/modify wrappers.
+    """
+
+    API_BASE = 'https://gmail.googleapis.com/gmail/v1/users/me'
+
+    # Concurrent chunks in flight; keeps aggregate request rate inside
+    # Gmail's per-user quota
+    MAX_CONCURRENT_CHUNKS = 5
+
+    def __init__(self, access_token: str):
+        """
+        Initialize the async Gmail service
+
+        Args:
+            access_token: OAuth2 access token for the Gmail account
+        """
+        super().__init__(credentials=None)
+        self.access_token = access_token
+        self._cache_scope = self._account_cache_scope({'token': access_token})
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared ClientSession, creating it on first use
+
+        One session per service instance keeps the underlying connection
+        pool warm across calls instead of paying a TLS handshake per
+        request.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={'Authorization': f'Bearer {self.access_token}'}
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared ClientSession"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            self._session = None
+
+    async def _fetch_one(self, message_id: str,
+                         semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        """Fetch and parse a single message over the shared session"""
+        session = self._get_session()
         try:
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body={'addLabelIds': [label_id]}
-            ).execute()
+            async with semaphore:
+                async with session.get(
+                    f'{self.API_BASE}/messages/{message_id}',
+                    params={'format': 'full'}
+                ) as response:
+                    response.raise_for_status()
+                    message = await response.json()
+            return self._parse_email(message)
+        except Exception as e:
+            print(f"Error fetching email {message_id}: {e}")
+            return None
+
+    async def _batch_chunk(self, message_ids: List[str],
+                           semaphore: asyncio.Semaphore) -> List[Optional[Dict[str, Any]]]:
+        """Fetch one chunk of message IDs concurrently"""
+        return list(await asyncio.gather(
+            *(self._fetch_one(mid, semaphore) for mid in message_ids)
+        ))
+
+    async def fetch_emails_async(self, message_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch many messages concurrently
+
+        Splits the IDs into BATCH_SIZE chunks and gathers them, so wall
+        time is bounded by the slowest chunk rather than the sum of N
+        sequential round trips.
+
+        Args:
+            message_ids: Gmail message IDs to fetch
+
+        Returns:
+            List of parsed email dictionaries in the original ID order
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_CHUNKS)
+        chunks = [
+            message_ids[start:start + self.BATCH_SIZE]
+            for start in range(0, len(message_ids), self.BATCH_SIZE)
+        ]
+        results = await asyncio.gather(
+            *(self._batch_chunk(chunk, semaphore) for chunk in chunks)
+        )
+        return [email_data for chunk in results for email_data in chunk if email_data]
+
+    async def modify_async(self, message_id: str,
+                           add: Optional[List[str]] = None,
+                           remove: Optional[List[str]] = None) -> bool:
+        """
+        Modify a message's labels
+
+        Args:
+            message_id: Gmail message ID
+            add: Label IDs to add
+            remove: Label IDs to remove
+
+        Returns:
+            True if the modification succeeded
+        """
+        body = {}
+        if add:
+            body['addLabelIds'] = add
+        if remove:
+            body['removeLabelIds'] = remove
+
+        session = self._get_session()
+        try:
+            async with session.post(
+                f'{self.API_BASE}/messages/{message_id}/modify',
+                json=body
+            ) as response:
+                response.raise_for_status()
             return True
-        except HttpError as error:
-            print(f"Error adding label: {error}")
+        except Exception as e:
+            print(f"Error modifying email {message_id}: {e}")
             return False
+
+    async def modify_many_async(self, message_ids: List[str],
+                                add: Optional[List[str]] = None,
+                                remove: Optional[List[str]] = None) -> int:
+        """Apply the same label change to many messages concurrently"""
+        results = await asyncio.gather(
+            *(self.modify_async(mid, add=add, remove=remove) for mid in message_ids)
+        )
+        return sum(results)
+
+    async def _run_and_close(self, coro):
+        """Await a coroutine, then release the session (for sync wrappers)"""
+        try:
+            return await coro
+        finally:
+            await self.close()
+
+    def fetch_emails(self, message_ids: List[str]) -> List[Dict[str, Any]]:
+        """Sync wrapper around fetch_emails_async for existing callers"""
+        return asyncio.run(self._run_and_close(self.fetch_emails_async(message_ids)))
+
+    def modify(self, message_id: str,
+               add: Optional[List[str]] = None,
+               remove: Optional[List[str]] = None) -> bool:
+        """Sync wrapper around modify_async for existing callers"""
+        return asyncio.run(self._run_and_close(
+            self.modify_async(message_id, add=add, remove=remove)
+        ))
@@ -3,7 +3,28 @@ Email Automation Data Models
 InboxAI - Lindy AI-like Email Automation Platform
 """
 
-from pydantic import BaseModel, EmailStr, Field
+import json
+import zlib
+from dataclasses import dataclass, field, fields
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # zstd level 3: ~5-10x on email HTML at several hundred MB/s
+    import zstandard
+
+    def _compress(data: bytes) -> bytes:
+        return zstandard.compress(data, 3)
+
+    _decompress = zstandard.decompress
+except ImportError:
+    _compress = zlib.compress
+    _decompress = zlib.decompress
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -38,8 +59,66 @@ class SubscriptionTier(str, Enum):
     BUSINESS = "business"
 
 
+@dataclass(slots=True)
+class ParsedEmail:
+    """Lean intermediate representation of a parsed Gmail message
+
+    Slotted dataclass instead of a dict: roughly half the per-instance
+    memory and attribute access without hashing, which matters with
+    thousands of messages held in the parse caches. Convert with
+    to_dict() at serialization boundaries (DB insert, JSON).
+    """
+    gmail_message_id: str
+    gmail_thread_id: str
+    subject: str = ''
+    from_email: str = ''
+    from_name: str = ''
+    to_email: str = ''
+    cc_emails: List[str] = field(default_factory=list)
+    bcc_emails: List[str] = field(default_factory=list)
+    received_at: Optional[datetime] = None
+    labels: List[str] = field(default_factory=list)
+    is_read: bool = False
+    is_starred: bool = False
+    body_plain: Optional[str] = None
+    body_html: Optional[bytes] = None
+    has_attachments: bool = False
+    attachment_count: int = 0
+    raw_data: Optional[bytes] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict of all fields (in-process use; see to_row)"""
+        return {name: getattr(self, name) for name in _PARSED_EMAIL_FIELDS}
+
+    def to_row(self) -> Dict[str, Any]:
+        """Dict shaped for the emails table insert
+
+        body_html and raw_data are held compressed in-process, but the
+        columns are TEXT/JSONB and the PostgREST client JSON-encodes the
+        payload (bytes and datetimes raise TypeError), so they are
+        expanded back - and received_at rendered to ISO 8601 - here at
+        the boundary.
+        """
+        row = self.to_dict()
+        if row['body_html'] is not None:
+            row['body_html'] = _decompress(row['body_html']).decode('utf-8')
+        if row['raw_data'] is not None:
+            raw = _decompress(row['raw_data'])
+            row['raw_data'] = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if row['received_at'] is not None:
+            row['received_at'] = row['received_at'].isoformat()
+        return row
+
+
+_PARSED_EMAIL_FIELDS = tuple(f.name for f in fields(ParsedEmail))
+
+
 class Email(BaseModel):
     """Email model"""
+    # Hot model: one instance per parsed Gmail message. Ignore unknown
+    # keys rather than erroring, and skip re-validation on assignment.
+    model_config = ConfigDict(extra='ignore', validate_assignment=False)
+
     id: str
     org_id: str
     user_id: str
@@ -52,17 +131,62 @@ class Email(BaseModel):
     cc_emails: Optional[List[str]] = None
     bcc_emails: Optional[List[str]] = None
     body_plain: Optional[str] = None
-    body_html: Optional[str] = None
+    # Compressed HTML (see compress_text); marketing emails run to
+    # hundreds of KB and would dominate row and cache size uncompressed
+    body_html: Optional[bytes] = None
     received_at: datetime
     labels: Optional[List[str]] = None
     is_read: bool = False
     is_starred: bool = False
     has_attachments: bool = False
     attachment_count: int = 0
-    raw_data: Optional[Dict[str, Any]] = None
+    # Compressed Gmail JSON (see compress_raw); kept as bytes so the raw
+    # payload doesn't double per-email memory and validation cost
+    raw_data: Optional[bytes] = None
     created_at: datetime
     updated_at: datetime
 
+    @staticmethod
+    def compress_raw(message: Dict[str, Any]) -> bytes:
+        """Compress a raw Gmail message for storage in raw_data"""
+        if orjson is not None:
+            encoded = orjson.dumps(message, default=str)
+        else:
+            encoded = json.dumps(message, default=str).encode('utf-8')
+        return _compress(encoded)
+
+    @property
+    def raw_data_dict(self) -> Optional[Dict[str, Any]]:
+        """Lazily decompress raw_data back to the original Gmail JSON"""
+        if self.raw_data is None:
+            return None
+        raw = _decompress(self.raw_data)
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+    @staticmethod
+    def compress_text(text: bytes) -> bytes:
+        """Compress a body blob for storage (e.g. body_html)"""
+        return _compress(text)
+
+    @property
+    def body_html_text(self) -> Optional[str]:
+        """Lazily decompress body_html back to the original HTML"""
+        if self.body_html is None:
+            return None
+        return _decompress(self.body_html).decode('utf-8')
+
+    @classmethod
+    def from_parsed(cls, data) -> 'Email':
+        """Build an Email from a ParsedEmail or parsed-message dict
+
+        Uses model_construct to skip field validation - the parser is a
+        trusted internal producer, and validating 20+ fields per message
+        is the dominant construction cost.
+        """
+        if isinstance(data, ParsedEmail):
+            data = data.to_dict()
+        return cls.model_construct(**data)
+
 
 class EmailClassification(BaseModel):
     """AI-powered email classification"""
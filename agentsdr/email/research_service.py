@@ -3,22 +3,148 @@ Sender Research Service
 InboxAI - Lindy AI-like Email Automation Platform
 """
 
+import asyncio
 import os
-import re
+import time
+from functools import lru_cache
+from threading import Lock
+
+import aiohttp
 import requests
-from typing import Dict, Any, Optional
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter, Retry
+from typing import Dict, Any, NamedTuple, Optional
 from urllib.parse import quote_plus
-from bs4 import BeautifulSoup
+
+try:
+    # C (lexbor) parser: an order of magnitude faster than html.parser
+    # for the handful of head tags we pull out of company homepages
+    from selectolax.parser import HTMLParser as _SelectolaxHTMLParser
+except ImportError:
+    _SelectolaxHTMLParser = None
+
+from agentsdr.core.cache import cache_get_json, cache_set_json
+
+# Separator -> space mapping for email local parts; str.translate is a
+# straight C loop, cheaper than regex machinery for a 3-char class
+_NAME_SEP_TRANS = str.maketrans('._-', '   ')
+
+# Shared across instances; Celery may build a ResearchService per task,
+# so don't rebuild the dict (or re-read the environment) each time
+_DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    # Homepages compress 5-10x; both requests and aiohttp decompress
+    # transparently (br via brotlicffi)
+    'Accept-Encoding': 'gzip, br',
+}
+
+
+@lru_cache(maxsize=1)
+def _clearbit_key() -> Optional[str]:
+    return os.getenv('CLEARBIT_API_KEY')
+
+
+@lru_cache(maxsize=1)
+def _hunter_key() -> Optional[str]:
+    return os.getenv('HUNTER_API_KEY')
+
+
+class _CircuitBreaker:
+    """Per-key circuit breaker for outbound lookups.
+
+    After fail_max consecutive failures a key (a sender domain or an
+    enrichment API) is short-circuited for reset_timeout seconds, so a
+    flapping upstream costs a dict lookup instead of timeout * retries
+    on every research call. After the cool-down one probe is let
+    through; success closes the circuit again.
+    """
+
+    def __init__(self, fail_max: int = 5, reset_timeout: int = 300):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures: Dict[str, Any] = {}  # key -> (count, last_failure)
+        self._lock = Lock()
+
+    def is_open(self, key: str) -> bool:
+        with self._lock:
+            entry = self._failures.get(key)
+            if entry is None:
+                return False
+            count, last_failure = entry
+            if count < self.fail_max:
+                return False
+            if time.monotonic() - last_failure >= self.reset_timeout:
+                # Half-open: let one probe through
+                self._failures[key] = (self.fail_max - 1, last_failure)
+                return False
+            return True
+
+    def record_failure(self, key: str) -> None:
+        with self._lock:
+            count = self._failures.get(key, (0, 0.0))[0]
+            self._failures[key] = (count + 1, time.monotonic())
+
+    def record_success(self, key: str) -> None:
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+_breaker = _CircuitBreaker()
+
+
+async def _none():
+    """Awaitable None for optional gather slots"""
+    return None
+
+
+class EmailIdentity(NamedTuple):
+    """Sender address parsed once and shared by all the lookups
+
+    name_hint is the local part with separators mapped to spaces, the
+    form the profile searches query with.
+    """
+    local: str
+    domain: Optional[str]
+    name_hint: str
+
+
+def _parse_identity(email_address: str) -> EmailIdentity:
+    local, _, domain = email_address.partition('@')
+    return EmailIdentity(local, domain or None, local.translate(_NAME_SEP_TRANS))
 
 
 class ResearchService:
     """Service for researching email senders"""
 
+    __slots__ = ('session', 'headers')
+
+    # The same sender domains (gmail.com, large employers) recur across
+    # hundreds of senders; cache company lookups per domain for a day so
+    # repeats hit memory instead of the network + HTML parser. One cache
+    # per process is fine under Celery prefork; Redis (below) shares hits
+    # across workers.
+    _company_cache = TTLCache(maxsize=10_000, ttl=86_400)
+    _company_cache_lock = Lock()
+
     def __init__(self):
         """Initialize research service"""
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
+        self.headers = _DEFAULT_HEADERS
+        # Pooled session: lookups hit the same hosts (Clearbit, Hunter,
+        # sender domains) repeatedly, so keep-alive saves a TCP+TLS
+        # handshake per call; retries cover transient upstream errors
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET'],
+                respect_retry_after_header=True
+            )
+        ))
 
     def research_sender(
         self,
@@ -26,7 +152,28 @@ class ResearchService:
         deep_research: bool = False
     ) -> Dict[str, Any]:
         """
-        Research an email sender
+        Research an email sender (sync wrapper over research_sender_async)
+
+        Args:
+            email_address: Email address to research
+            deep_research: Whether to perform deep research
+
+        Returns:
+            Research data dictionary
+        """
+        return asyncio.run(self.research_sender_async(email_address, deep_research))
+
+    async def research_sender_async(
+        self,
+        email_address: str,
+        deep_research: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Research an email sender with the sub-lookups running concurrently
+
+        The company, LinkedIn, Twitter and personal-website lookups are
+        independent network calls; gathering them bounds wall time by the
+        slowest lookup instead of the sum of all timeouts.
 
         Args:
             email_address: Email address to research
@@ -52,38 +199,58 @@ class ResearchService:
         }
 
         try:
-            # Extract domain from email
-            domain = email_address.split('@')[1] if '@' in email_address else None
-
-            # Research company from domain
-            if domain:
-                company_info = self._research_company(domain)
-                research_data["company"] = company_info.get("name")
-                research_data["website"] = company_info.get("website")
-                research_data["company_info"] = company_info
-
-            # Search for LinkedIn profile
-            linkedin_url = self._search_linkedin(email_address)
-            if linkedin_url:
-                research_data["linkedin_url"] = linkedin_url
-
-                # If deep research, scrape LinkedIn (mock for now)
-                if deep_research:
-                    linkedin_data = self._scrape_linkedin(linkedin_url)
-                    research_data["full_name"] = linkedin_data.get("name")
-                    research_data["job_title"] = linkedin_data.get("title")
-                    research_data["bio"] = linkedin_data.get("bio")
-                    research_data["location"] = linkedin_data.get("location")
-
-            # Search for Twitter profile
-            twitter_url = self._search_twitter(email_address)
-            if twitter_url:
-                research_data["twitter_url"] = twitter_url
-
-            # Search for personal website/blog
-            website = self._search_personal_website(email_address)
-            if website:
-                research_data["website"] = website
+            # Parse the address once; every lookup shares the result
+            ident = _parse_identity(email_address)
+            domain = ident.domain
+
+            connector = aiohttp.TCPConnector(limit_per_host=8, keepalive_timeout=30)
+            async with aiohttp.ClientSession(
+                connector=connector, headers=self.headers
+            ) as session:
+                company_info, linkedin_url, twitter_url, website = await asyncio.gather(
+                    self._research_company(domain, session) if domain else _none(),
+                    self._search_linkedin(ident, session),
+                    self._search_twitter(ident, session),
+                    self._search_personal_website(ident, session),
+                    return_exceptions=True
+                )
+
+                # A failed lookup shouldn't sink the others
+                if isinstance(company_info, Exception):
+                    print(f"Error researching company {domain}: {company_info}")
+                    company_info = None
+                if isinstance(linkedin_url, Exception):
+                    print(f"Error searching LinkedIn: {linkedin_url}")
+                    linkedin_url = None
+                if isinstance(twitter_url, Exception):
+                    print(f"Error searching Twitter: {twitter_url}")
+                    twitter_url = None
+                if isinstance(website, Exception):
+                    print(f"Error searching for website: {website}")
+                    website = None
+
+                if company_info:
+                    research_data["company"] = company_info.get("name")
+                    research_data["website"] = company_info.get("website")
+                    research_data["company_info"] = company_info
+
+                if linkedin_url:
+                    research_data["linkedin_url"] = linkedin_url
+
+                    # If deep research, scrape LinkedIn (mock for now)
+                    if deep_research:
+                        linkedin_data = self._scrape_linkedin(linkedin_url)
+                        research_data["full_name"] = linkedin_data.get("name")
+                        research_data["job_title"] = linkedin_data.get("title")
+                        research_data["bio"] = linkedin_data.get("bio")
+                        research_data["location"] = linkedin_data.get("location")
+
+                if twitter_url:
+                    research_data["twitter_url"] = twitter_url
+
+                # Personal website takes precedence over the company site
+                if website:
+                    research_data["website"] = website
 
             # Aggregate social profiles
             social_profiles = {}
@@ -99,16 +266,31 @@ class ResearchService:
             print(f"Error researching sender {email_address}: {e}")
             return research_data
 
-    def _research_company(self, domain: str) -> Dict[str, Any]:
+    async def _research_company(self, domain: str,
+                                session: aiohttp.ClientSession) -> Dict[str, Any]:
         """
         Research company from domain
 
         Args:
             domain: Company domain
+            session: Shared aiohttp session
 
         Returns:
             Company information
         """
+        key = domain.lower()
+        with self._company_cache_lock:
+            cached = self._company_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Second tier: Redis, shared across Celery workers
+        cached = cache_get_json(f"company:{key}")
+        if cached is not None:
+            with self._company_cache_lock:
+                self._company_cache[key] = cached
+            return cached
+
         company_info = {
             "name": None,
             "website": f"https://{domain}",
@@ -117,17 +299,50 @@ class ResearchService:
             "size": None
         }
 
+        # A domain that keeps failing is short-circuited for a cool-down
+        # window instead of burning the full timeout per sender behind it
+        if _breaker.is_open(key):
+            return company_info
+
         try:
             # Try to fetch company website
-            response = requests.get(
+            async with session.get(
                 f"https://{domain}",
-                headers=self.headers,
-                timeout=10,
+                timeout=aiohttp.ClientTimeout(total=10),
                 allow_redirects=True
-            )
-
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+            ) as response:
+                if response.status != 200:
+                    if response.status == 429 or response.status >= 500:
+                        _breaker.record_failure(key)
+                    return company_info
+                # The <title> and meta tags all live in <head>; the first
+                # 256 KB is plenty and caps both bandwidth and parse cost
+                # on media-heavy homepages
+                charset = response.charset or 'utf-8'
+                raw = await response.content.read(256_000)
+
+            text = raw.decode(charset, errors='replace')
+
+            if _SelectolaxHTMLParser is not None:
+                tree = _SelectolaxHTMLParser(text)
+                # Title first, then Open Graph tags override it
+                title = tree.css_first('title')
+                if title:
+                    company_info["name"] = title.text(strip=True)
+                for selector, info_key in (
+                    ('meta[name="description"]', 'description'),
+                    ('meta[property="og:title"]', 'name'),
+                    ('meta[property="og:description"]', 'description'),
+                ):
+                    node = tree.css_first(selector)
+                    if node:
+                        company_info[info_key] = (node.attributes.get('content') or '').strip()
+            else:
+                # Fallback only; imported lazily so workers with
+                # selectolax never pay the bs4 import
+                from bs4 import BeautifulSoup
+
+                soup = BeautifulSoup(text, 'html.parser')
 
                 # Try to extract company name from title
                 title = soup.find('title')
@@ -148,29 +363,35 @@ class ResearchService:
                 if og_desc:
                     company_info["description"] = og_desc.get('content', '').strip()
 
+            _breaker.record_success(key)
+
         except Exception as e:
+            _breaker.record_failure(key)
             print(f"Error researching company {domain}: {e}")
 
+        # Cache negatives too - a dead or empty domain shouldn't be
+        # re-fetched for every sender behind it
+        with self._company_cache_lock:
+            self._company_cache[key] = company_info
+        cache_set_json(f"company:{key}", company_info, ttl=86_400)
+
         return company_info
 
-    def _search_linkedin(self, email_address: str) -> Optional[str]:
+    async def _search_linkedin(self, ident: EmailIdentity,
+                               session: aiohttp.ClientSession) -> Optional[str]:
         """
         Search for LinkedIn profile
 
         Args:
-            email_address: Email address
+            ident: Parsed sender identity
+            session: Shared aiohttp session
 
         Returns:
             LinkedIn URL if found
         """
         try:
-            # Extract name from email if possible
-            name_part = email_address.split('@')[0]
-            # Clean up common patterns
-            name_part = re.sub(r'[._-]', ' ', name_part)
-
             # Google search for LinkedIn profile (mock implementation)
-            search_query = f"{name_part} site:linkedin.com"
+            search_query = f"{ident.name_hint} site:linkedin.com"
             search_url = f"https://www.google.com/search?q={quote_plus(search_query)}"
 
             # In production, would use proper LinkedIn API or web scraping
@@ -212,21 +433,19 @@ class ResearchService:
 
         return profile_data
 
-    def _search_twitter(self, email_address: str) -> Optional[str]:
+    async def _search_twitter(self, ident: EmailIdentity,
+                              session: aiohttp.ClientSession) -> Optional[str]:
         """
         Search for Twitter profile
 
         Args:
-            email_address: Email address
+            ident: Parsed sender identity
+            session: Shared aiohttp session
 
         Returns:
             Twitter URL if found
         """
         try:
-            # Extract name from email
-            name_part = email_address.split('@')[0]
-            name_part = re.sub(r'[._-]', ' ', name_part)
-
             # Search for Twitter profile (mock implementation)
             # In production, would use Twitter API or search
 
@@ -236,20 +455,19 @@ class ResearchService:
             print(f"Error searching Twitter: {e}")
             return None
 
-    def _search_personal_website(self, email_address: str) -> Optional[str]:
+    async def _search_personal_website(self, ident: EmailIdentity,
+                                       session: aiohttp.ClientSession) -> Optional[str]:
         """
         Search for personal website
 
         Args:
-            email_address: Email address
+            ident: Parsed sender identity
+            session: Shared aiohttp session
 
         Returns:
             Website URL if found
         """
         try:
-            # Extract name from email
-            name_part = email_address.split('@')[0]
-
             # Search for personal website (mock implementation)
             # Would use Google Custom Search API or similar
 
@@ -269,20 +487,26 @@ class ResearchService:
         Returns:
             Enriched data
         """
-        clearbit_api_key = os.getenv('CLEARBIT_API_KEY')
+        clearbit_api_key = _clearbit_key()
 
         if not clearbit_api_key:
             return {}
 
+        if _breaker.is_open('clearbit'):
+            return {}
+
         try:
             # Clearbit Enrichment API
-            response = requests.get(
+            response = self.session.get(
                 f"https://person.clearbit.com/v2/combined/find?email={email_address}",
                 headers={'Authorization': f'Bearer {clearbit_api_key}'},
-                timeout=10
+                timeout=(3, 7)
             )
 
-            if response.status_code == 200:
+            if response.status_code == 429 or response.status_code >= 500:
+                _breaker.record_failure('clearbit')
+            elif response.status_code == 200:
+                _breaker.record_success('clearbit')
                 data = response.json()
 
                 person = data.get('person', {})
@@ -306,6 +530,7 @@ class ResearchService:
                 }
 
         except Exception as e:
+            _breaker.record_failure('clearbit')
             print(f"Error enriching with Clearbit: {e}")
 
         return {}
@@ -320,23 +545,29 @@ class ResearchService:
         Returns:
             Enriched data
         """
-        hunter_api_key = os.getenv('HUNTER_API_KEY')
+        hunter_api_key = _hunter_key()
 
         if not hunter_api_key:
             return {}
 
+        if _breaker.is_open('hunter'):
+            return {}
+
         try:
             # Hunter Email Verifier API
-            response = requests.get(
+            response = self.session.get(
                 f"https://api.hunter.io/v2/email-verifier",
                 params={
                     'email': email_address,
                     'api_key': hunter_api_key
                 },
-                timeout=10
+                timeout=(3, 7)
             )
 
-            if response.status_code == 200:
+            if response.status_code == 429 or response.status_code >= 500:
+                _breaker.record_failure('hunter')
+            elif response.status_code == 200:
+                _breaker.record_success('hunter')
                 data = response.json().get('data', {})
 
                 return {
@@ -348,6 +579,7 @@ class ResearchService:
                 }
 
         except Exception as e:
+            _breaker.record_failure('hunter')
             print(f"Error enriching with Hunter: {e}")
 
         return {}
@@ -4,11 +4,23 @@ InboxAI - Lindy AI-like Email Automation Platform
 """
 
 import os
+import queue
+import time
 from datetime import datetime, timedelta
+from threading import Thread
 from typing import List, Dict, Any
 
+from celery import chain, group
+
 from agentsdr.celery_config import celery_app
 from agentsdr.email.gmail_service import GmailService
+from agentsdr.core.cache import (
+    cache_delete,
+    cache_get_json,
+    cache_set_json,
+    get_redis,
+    sender_research_cache_key,
+)
 from agentsdr.core.supabase_client import get_supabase_client
 
 
@@ -31,44 +43,54 @@ def fetch_user_emails(user_id: str, org_id: str, credentials: Dict[str, Any]) ->
 
         # Fetch emails from last 24 hours
         after_date = datetime.now() - timedelta(hours=24)
-        emails = gmail.fetch_emails(
-            max_results=100,
-            after_date=after_date
-        )
 
-        # Store emails in database
         supabase = get_supabase_client()
+        fetched_count = 0
         stored_count = 0
+        sigs = []
 
-        for email_data in emails:
-            try:
-                # Check if email already exists
-                existing = supabase.table('emails').select('id').eq(
-                    'gmail_message_id', email_data['gmail_message_id']
-                ).eq('user_id', user_id).execute()
-
-                if not existing.data:
-                    # Add user and org IDs
-                    email_data['user_id'] = user_id
-                    email_data['org_id'] = org_id
-
-                    # Store email
-                    supabase.table('emails').insert(email_data).execute()
-                    stored_count += 1
-
-                    # Trigger classification task
-                    classify_email.delay(
-                        email_id=email_data.get('id'),
-                        user_id=user_id
-                    )
+        # Producer thread streams parsed emails into a bounded queue while
+        # this thread batches the inserts, overlapping Gmail I/O with
+        # Supabase I/O so total time tracks the slower leg, not the sum
+        pending = queue.Queue(maxsize=100)
+        done = object()
 
-            except Exception as e:
-                print(f"Error storing email: {e}")
-                continue
+        def _produce():
+            try:
+                for email_data in gmail.iter_emails(max_results=100, after_date=after_date):
+                    pending.put(email_data)
+            except Exception as exc:
+                pending.put(exc)
+            finally:
+                pending.put(done)
+
+        Thread(target=_produce, daemon=True).start()
+
+        batch = []
+        while True:
+            item = pending.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            fetched_count += 1
+            batch.append(item)
+            if len(batch) >= INSERT_BATCH_SIZE:
+                stored_count += _store_email_batch(supabase, batch, user_id, org_id, sigs)
+                batch = []
+
+        if batch:
+            stored_count += _store_email_batch(supabase, batch, user_id, org_id, sigs)
+
+        # Chain classification -> conditional draft per row and dispatch
+        # the whole batch as one group, so Celery sees the task graph
+        # instead of tasks spawning tasks
+        if sigs:
+            group(sigs).apply_async()
 
         return {
             'status': 'success',
-            'fetched': len(emails),
+            'fetched': fetched_count,
             'stored': stored_count,
             'user_id': user_id
         }
@@ -81,6 +103,56 @@ def fetch_user_emails(user_id: str, org_id: str, credentials: Dict[str, Any]) ->
         }
 
 
+# Rows per Supabase insert while draining the fetch queue; small enough
+# to start writing while Gmail batches are still arriving
+INSERT_BATCH_SIZE = 25
+
+
+def _store_email_batch(supabase, emails, user_id: str, org_id: str, sigs) -> int:
+    """Insert a chunk of parsed emails, skipping ones already stored
+
+    One bulk existence check + one bulk insert per chunk instead of a
+    SELECT and INSERT round trip per email. Appends a classify -> draft
+    chain signature per inserted row to sigs.
+
+    Returns:
+        Number of rows stored
+    """
+    message_ids = [email_data.gmail_message_id for email_data in emails]
+    try:
+        existing = supabase.table('emails').select('gmail_message_id').eq(
+            'user_id', user_id
+        ).in_('gmail_message_id', message_ids).execute()
+        have = {row['gmail_message_id'] for row in existing.data}
+
+        to_insert = []
+        for email_data in emails:
+            if email_data.gmail_message_id in have:
+                continue
+            # to_row() expands the compressed fields back to the TEXT/JSONB
+            # shapes the emails columns (and the JSON encoder) expect
+            record = email_data.to_row()
+            record['user_id'] = user_id
+            record['org_id'] = org_id
+            to_insert.append(record)
+
+        if not to_insert:
+            return 0
+
+        inserted = supabase.table('emails').insert(to_insert).execute()
+        sigs.extend(
+            chain(
+                classify_email.s(row.get('id'), user_id),
+                draft_if_urgent.s(user_id)
+            )
+            for row in inserted.data or []
+        )
+        return len(inserted.data or to_insert)
+    except Exception as e:
+        print(f"Error storing emails: {e}")
+        return 0
+
+
 @celery_app.task(name='agentsdr.email.tasks.fetch_all_user_emails')
 def fetch_all_user_emails() -> Dict[str, Any]:
     """
@@ -92,21 +164,26 @@ def fetch_all_user_emails() -> Dict[str, Any]:
     try:
         supabase = get_supabase_client()
 
-        # Get all organizations with Gmail credentials
+        # One embedded-resource query returns the whole org -> members
+        # tree in a single HTTP call instead of a members query per org,
+        # so there are no per-org round trips left to overlap with an
+        # async client; the rest of the task is broker publishes only
         # This is a simplified version - in production you'd store credentials securely
-        orgs = supabase.table('organizations').select('*').execute()
+        orgs = supabase.table('organizations').select(
+            'id, organization_members(user_id)'
+        ).execute()
 
         total_fetched = 0
         total_stored = 0
         errors = []
 
-        for org in orgs.data:
-            # Get org members
-            members = supabase.table('organization_members').select(
-                'user_id'
-            ).eq('org_id', org['id']).execute()
+        # Collect all (user, org, credentials) work items first, then
+        # dispatch them as grouped signatures in chunks so the broker sees
+        # O(N/50) publishes instead of one round-trip per user
+        work_items = []
 
-            for member in members.data:
+        for org in orgs.data:
+            for member in org.get('organization_members') or []:
                 # Get user credentials (stored securely)
                 # In production, retrieve encrypted credentials
                 user_id = member['user_id']
@@ -116,14 +193,22 @@ def fetch_all_user_emails() -> Dict[str, Any]:
                 credentials = {}  # Placeholder
 
                 if credentials:
-                    result = fetch_user_emails.delay(
-                        user_id=user_id,
-                        org_id=org['id'],
-                        credentials=credentials
-                    )
+                    work_items.append((user_id, org['id'], credentials))
+
+        chunk_size = 50
+        for i in range(0, len(work_items), chunk_size):
+            group(
+                fetch_user_emails.s(
+                    user_id=user_id,
+                    org_id=org_id,
+                    credentials=credentials
+                )
+                for user_id, org_id, credentials in work_items[i:i + chunk_size]
+            ).apply_async()
 
         return {
             'status': 'success',
+            'dispatched': len(work_items),
             'total_fetched': total_fetched,
             'total_stored': total_stored,
             'errors': errors
@@ -136,6 +221,61 @@ def fetch_all_user_emails() -> Dict[str, Any]:
         }
 
 
+@celery_app.task(name='agentsdr.email.tasks.refresh_agent_summaries')
+def refresh_agent_summaries(
+    agent_id: str,
+    refresh_token: str,
+    criteria_type: str = 'last_24_hours',
+    count: int = 10
+) -> Dict[str, Any]:
+    """
+    Fetch and summarize an agent's emails off the request thread
+
+    Results are cached in Redis so the summarize endpoint can answer from
+    cache instead of blocking a web worker on Gmail + OpenAI round-trips.
+
+    Args:
+        agent_id: Agent ID
+        refresh_token: Gmail OAuth refresh token
+        criteria_type: Summary criteria (e.g. last_24_hours)
+        count: Number of emails to summarize
+
+    Returns:
+        Result dictionary with count and status
+    """
+    try:
+        from flask import Flask
+        from agentsdr.core.cache import cache_set_json, summaries_cache_key
+
+        # The Gmail/OpenAI service code logs via current_app, so give the
+        # worker a minimal app context (same pattern as scheduler.py)
+        app = Flask(__name__)
+        app.config.from_object('config.Config')
+
+        with app.app_context():
+            from agentsdr.services.gmail_service import fetch_and_summarize_emails
+            summaries = fetch_and_summarize_emails(refresh_token, criteria_type, count)
+
+        cache_set_json(
+            summaries_cache_key(agent_id, criteria_type, count),
+            summaries,
+            ttl=120
+        )
+
+        return {
+            'status': 'success',
+            'agent_id': agent_id,
+            'count': len(summaries)
+        }
+
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': str(e),
+            'agent_id': agent_id
+        }
+
+
 @celery_app.task(name='agentsdr.email.tasks.classify_email')
 def classify_email(email_id: str, user_id: str) -> Dict[str, Any]:
     """
@@ -149,8 +289,6 @@ def classify_email(email_id: str, user_id: str) -> Dict[str, Any]:
         Classification result
     """
     try:
-        from agentsdr.email.ai_service import AIService
-
         supabase = get_supabase_client()
 
         # Get email
@@ -160,7 +298,7 @@ def classify_email(email_id: str, user_id: str) -> Dict[str, Any]:
             return {'status': 'error', 'error': 'Email not found'}
 
         # Classify with AI
-        ai_service = AIService()
+        ai_service = _get_ai_service()
         classification = ai_service.classify_email(
             subject=email.data.get('subject'),
             body=email.data.get('body_plain'),
@@ -174,22 +312,18 @@ def classify_email(email_id: str, user_id: str) -> Dict[str, Any]:
 
         result = supabase.table('email_classifications').insert(classification).execute()
 
-        # Deduct credits
-        supabase.rpc('deduct_credits', {
-            'p_user_id': user_id,
-            'p_org_id': email.data.get('org_id'),
-            'p_credits': 1,
-            'p_action_type': 'email_classification',
-            'p_description': f'Classified email: {email.data.get("subject")}'
-        }).execute()
-
-        # If urgent, trigger draft response
-        if classification.get('category') == 'urgent':
-            draft_email_response.delay(email_id=email_id, user_id=user_id)
+        # Deduct credits (settled in bulk by flush_credits)
+        _queue_credit_deduction(
+            user_id, email.data.get('org_id'), 1, 'email_classification',
+            description=f'Classified email: {email.data.get("subject")}'
+        )
 
+        # Return the email row alongside the classification so the next
+        # task in the chain (draft_if_urgent) doesn't re-query it
         return {
             'status': 'success',
-            'classification': classification
+            'classification': classification,
+            'email': email.data
         }
 
     except Exception as e:
@@ -199,6 +333,32 @@ def classify_email(email_id: str, user_id: str) -> Dict[str, Any]:
         }
 
 
+@celery_app.task(name='agentsdr.email.tasks.draft_if_urgent')
+def draft_if_urgent(classify_result: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """
+    Chain step after classify_email: draft a response for urgent emails
+
+    Receives the classification result (including the email row) from the
+    previous task in the chain, so no Supabase round trip is needed to
+    decide or to draft.
+
+    Args:
+        classify_result: Result dict from classify_email
+        user_id: User ID
+
+    Returns:
+        Draft result, or a skipped/error status
+    """
+    if classify_result.get('status') != 'success':
+        return classify_result
+
+    classification = classify_result.get('classification') or {}
+    if classification.get('category') != 'urgent':
+        return {'status': 'skipped', 'reason': 'not_urgent'}
+
+    return _draft_response(classify_result.get('email'), user_id)
+
+
 @celery_app.task(name='agentsdr.email.tasks.draft_email_response')
 def draft_email_response(
     email_id: str,
@@ -219,8 +379,6 @@ def draft_email_response(
         Draft result
     """
     try:
-        from agentsdr.email.ai_service import AIService
-
         supabase = get_supabase_client()
 
         # Get email
@@ -229,33 +387,53 @@ def draft_email_response(
         if not email.data:
             return {'status': 'error', 'error': 'Email not found'}
 
+        return _draft_response(email.data, user_id, tone=tone,
+                               custom_instructions=custom_instructions)
+
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': str(e)
+        }
+
+
+def _draft_response(
+    email_row: Dict[str, Any],
+    user_id: str,
+    tone: str = 'professional',
+    custom_instructions: str = None
+) -> Dict[str, Any]:
+    """Generate, store and bill an AI draft for an already-fetched email row"""
+    try:
+        if not email_row:
+            return {'status': 'error', 'error': 'Email not found'}
+
+        supabase = get_supabase_client()
+
         # Generate draft
-        ai_service = AIService()
+        ai_service = _get_ai_service()
         draft = ai_service.draft_response(
-            subject=email.data.get('subject'),
-            body=email.data.get('body_plain'),
-            from_email=email.data.get('from_email'),
+            subject=email_row.get('subject'),
+            body=email_row.get('body_plain'),
+            from_email=email_row.get('from_email'),
             user_id=user_id,
             tone=tone,
             custom_instructions=custom_instructions
         )
 
         # Store draft
-        draft['email_id'] = email_id
+        draft['email_id'] = email_row.get('id')
         draft['user_id'] = user_id
         draft['tone'] = tone
 
         result = supabase.table('email_drafts').insert(draft).execute()
 
-        # Deduct credits
+        # Deduct credits (settled in bulk by flush_credits)
         credits_cost = 3 if len(draft.get('draft_body', '')) < 500 else 7
-        supabase.rpc('deduct_credits', {
-            'p_user_id': user_id,
-            'p_org_id': email.data.get('org_id'),
-            'p_credits': credits_cost,
-            'p_action_type': 'email_draft',
-            'p_description': f'Drafted response for: {email.data.get("subject")}'
-        }).execute()
+        _queue_credit_deduction(
+            user_id, email_row.get('org_id'), credits_cost, 'email_draft',
+            description=f'Drafted response for: {email_row.get("subject")}'
+        )
 
         return {
             'status': 'success',
@@ -269,8 +447,129 @@ def draft_email_response(
         }
 
 
+# Worker-level AIService singleton: one OpenAI client (and its pooled
+# HTTP connections) per process instead of one per task invocation
+_ai_service = None
+
+
+def _get_ai_service():
+    global _ai_service
+    if _ai_service is None:
+        from agentsdr.email.ai_service import AIService
+        _ai_service = AIService()
+    return _ai_service
+
+
+# Sender research freshness window in seconds
+SENDER_RESEARCH_TTL = 7 * 86400
+
+# Pending credit deductions accumulate under these Redis keys (hash of
+# action_type -> credits per user/org) and settle in one bulk RPC from
+# flush_credits, instead of one deduct_credits round trip per task
+_CREDITS_PENDING_PREFIX = 'credits:pending:'
+
+
+def _queue_credit_deduction(user_id: str, org_id: str, credits: int,
+                            action_type: str, description: str = None) -> None:
+    """Accumulate a credit deduction for batched settlement
+
+    Falls back to the immediate per-call RPC when Redis is unreachable so
+    deductions are never silently dropped.
+    """
+    try:
+        get_redis().hincrby(
+            f'{_CREDITS_PENDING_PREFIX}{user_id}:{org_id}', action_type, credits
+        )
+        return
+    except Exception:
+        pass
+
+    get_supabase_client().rpc('deduct_credits', {
+        'p_user_id': user_id,
+        'p_org_id': org_id,
+        'p_credits': credits,
+        'p_action_type': action_type,
+        'p_description': description
+    }).execute()
+
+
+@celery_app.task(name='agentsdr.email.tasks.flush_credits')
+def flush_credits() -> Dict[str, Any]:
+    """
+    Settle pending credit deductions in one bulk RPC
+
+    Drains the credits:pending:* hashes written by
+    _queue_credit_deduction and calls deduct_credits_bulk (migration
+    006) once, cutting Supabase RPC load from one call per email to one
+    per beat interval.
+
+    Returns:
+        Summary of settled deductions
+    """
+    try:
+        r = get_redis()
+
+        user_ids = []
+        org_ids = []
+        credits = []
+        action_types = []
+        descriptions = []
+        drained = []  # (key, fields) held until the RPC settles
+
+        for key in list(r.scan_iter(match=f'{_CREDITS_PENDING_PREFIX}*', count=100)):
+            # Read and delete atomically so increments racing the flush
+            # land in a fresh hash for the next run
+            pipe = r.pipeline()
+            pipe.hgetall(key)
+            pipe.delete(key)
+            fields, _ = pipe.execute()
+            if not fields:
+                continue
+
+            drained.append((key, fields))
+            _, _, user_id, org_id = key.split(':')
+            for action_type, amount in fields.items():
+                user_ids.append(user_id)
+                org_ids.append(org_id)
+                credits.append(int(amount))
+                action_types.append(action_type)
+                descriptions.append(f'Batched settlement: {action_type}')
+
+        if not user_ids:
+            return {'status': 'success', 'settled': 0}
+
+        try:
+            result = get_supabase_client().rpc('deduct_credits_bulk', {
+                'p_user_ids': user_ids,
+                'p_org_ids': org_ids,
+                'p_credits': credits,
+                'p_action_types': action_types,
+                'p_descriptions': descriptions
+            }).execute()
+        except Exception:
+            # Put the drained amounts back so a transient Supabase error
+            # doesn't silently zero out owed credits; HINCRBY merges with
+            # any increments that landed since, and the next beat run
+            # retries the settlement
+            pipe = r.pipeline()
+            for key, fields in drained:
+                for action_type, amount in fields.items():
+                    pipe.hincrby(key, action_type, int(amount))
+            pipe.execute()
+            raise
+
+        return {'status': 'success', 'settled': result.data}
+
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': str(e)
+        }
+
+
 @celery_app.task(name='agentsdr.email.tasks.research_sender')
-def research_sender(email_address: str, user_id: str, deep_research: bool = False) -> Dict[str, Any]:
+def research_sender(email_address: str, user_id: str, deep_research: bool = False,
+                    force: bool = False) -> Dict[str, Any]:
     """
     Research an email sender
 
@@ -278,6 +577,7 @@ def research_sender(email_address: str, user_id: str, deep_research: bool = Fals
         email_address: Sender email
         user_id: User ID
         deep_research: Whether to perform deep research
+        force: Skip caches and re-research even if recent data exists
 
     Returns:
         Research result
@@ -285,53 +585,88 @@ def research_sender(email_address: str, user_id: str, deep_research: bool = Fals
     try:
         from agentsdr.email.research_service import ResearchService
 
-        supabase = get_supabase_client()
-
-        # Check if already researched recently
-        existing = supabase.table('sender_research').select('*').eq(
-            'email_address', email_address
-        ).eq('user_id', user_id).execute()
+        cache_key = sender_research_cache_key(user_id, email_address)
 
-        # If researched in last 7 days, return cached data
-        if existing.data:
-            last_researched = datetime.fromisoformat(existing.data[0]['last_researched_at'])
-            if datetime.now() - last_researched < timedelta(days=7):
+        # Redis front cache: hot senders short-circuit here with zero
+        # Supabase round trips. A miss (or unreachable Redis) falls
+        # through to the 7-day check against the table.
+        if force:
+            cache_delete(cache_key)
+        else:
+            cached = cache_get_json(cache_key)
+            if cached is not None:
                 return {
                     'status': 'success',
-                    'research': existing.data[0],
+                    'research': cached,
                     'cached': True
                 }
 
-        # Perform research
-        research_service = ResearchService()
-        research_data = research_service.research_sender(
-            email_address=email_address,
-            deep_research=deep_research
-        )
+        supabase = get_supabase_client()
+        now_epoch = int(time.time())
+
+        # Freshness filter runs server-side on the indexed epoch column
+        # (migration 005): an integer comparison in Postgres, no ISO
+        # timestamp parsing here, and stale rows never cross the wire
+        if not force:
+            existing = supabase.table('sender_research').select('*').eq(
+                'email_address', email_address
+            ).eq('user_id', user_id).gte(
+                'last_researched_at_epoch', now_epoch - SENDER_RESEARCH_TTL
+            ).execute()
 
-        # Store research
-        research_data['email_address'] = email_address
-        research_data['user_id'] = user_id
-        research_data['last_researched_at'] = datetime.now().isoformat()
+            if existing.data:
+                # Backfill Redis for the remainder of the freshness window
+                remaining = existing.data[0]['last_researched_at_epoch'] + SENDER_RESEARCH_TTL - now_epoch
+                cache_set_json(cache_key, existing.data[0], ttl=remaining)
+                return {
+                    'status': 'success',
+                    'research': existing.data[0],
+                    'cached': True
+                }
 
-        if existing.data:
-            # Update
-            result = supabase.table('sender_research').update(research_data).eq(
-                'id', existing.data[0]['id']
+        # Collapse duplicate work: under bursty load the same sender can
+        # be queued several times before the first write-back. SET NX EX
+        # makes one worker the researcher; the rest exit early and pick
+        # up the cache on their next trigger.
+        lock_key = f"lock:{cache_key}"
+        try:
+            got_lock = bool(get_redis().set(lock_key, '1', nx=True, ex=60))
+        except Exception:
+            got_lock = True  # Redis unreachable: research rather than drop
+        if not got_lock:
+            return {'status': 'skipped', 'reason': 'in_progress'}
+
+        try:
+            # Perform research
+            research_service = ResearchService()
+            research_data = research_service.research_sender(
+                email_address=email_address,
+                deep_research=deep_research
+            )
+
+            # Store research
+            research_data['email_address'] = email_address
+            research_data['user_id'] = user_id
+            research_data['last_researched_at'] = datetime.now().isoformat()
+            research_data['last_researched_at_epoch'] = now_epoch
+
+            # One upsert instead of a SELECT plus an update-vs-insert branch;
+            # Postgres resolves the conflict via the (email_address, user_id)
+            # unique constraint
+            result = supabase.table('sender_research').upsert(
+                research_data, on_conflict='email_address,user_id'
             ).execute()
-        else:
-            # Insert
-            result = supabase.table('sender_research').insert(research_data).execute()
 
-        # Deduct credits
+            cache_set_json(cache_key, research_data, ttl=SENDER_RESEARCH_TTL)
+        finally:
+            cache_delete(lock_key)
+
+        # Deduct credits (settled in bulk by flush_credits)
         credits_cost = 5 if deep_research else 2
-        supabase.rpc('deduct_credits', {
-            'p_user_id': user_id,
-            'p_org_id': user_id,  # Simplified - should get from context
-            'p_credits': credits_cost,
-            'p_action_type': 'sender_research',
-            'p_description': f'Researched sender: {email_address}'
-        }).execute()
+        _queue_credit_deduction(
+            user_id, user_id, credits_cost, 'sender_research',  # Simplified - org should come from context
+            description=f'Researched sender: {email_address}'
+        )
 
         return {
             'status': 'success',
@@ -359,28 +694,27 @@ def process_follow_ups() -> Dict[str, Any]:
 
         # Get follow-ups that are due
         now = datetime.now().isoformat()
-        follow_ups = supabase.table('follow_up_schedules').select('*').lte(
+        follow_ups = supabase.table('follow_up_schedules').select('id').lte(
             'scheduled_time', now
         ).eq('is_completed', False).eq('is_cancelled', False).execute()
 
         processed = 0
         errors = []
 
-        for follow_up in follow_ups.data:
+        # Send follow-up email
+        # TODO: Implement actual sending
+        # For now, just mark as completed - one bulk UPDATE instead of a
+        # round trip per row
+        ids = [follow_up['id'] for follow_up in follow_ups.data]
+        if ids:
             try:
-                # Send follow-up email
-                # TODO: Implement actual sending
-                # For now, just mark as completed
-
                 supabase.table('follow_up_schedules').update({
                     'is_completed': True,
                     'completed_at': datetime.now().isoformat()
-                }).eq('id', follow_up['id']).execute()
-
-                processed += 1
-
+                }).in_('id', ids).execute()
+                processed = len(ids)
             except Exception as e:
-                errors.append({'follow_up_id': follow_up['id'], 'error': str(e)})
+                errors.append({'follow_up_ids': ids, 'error': str(e)})
 
         return {
             'status': 'success',
@@ -406,31 +740,14 @@ def reset_monthly_credits() -> Dict[str, Any]:
     try:
         supabase = get_supabase_client()
 
-        # Get all user credits
-        credits = supabase.table('user_credits').select('*').execute()
-
-        reset_count = 0
-
-        for credit in credits.data:
-            tier = credit.get('subscription_tier', 'free')
-
-            # Get tier limits
-            from agentsdr.email.models import TIER_LIMITS
-            monthly_credits = TIER_LIMITS[tier]['monthly_credits']
-
-            # Reset credits
-            supabase.table('user_credits').update({
-                'total_credits': monthly_credits,
-                'used_credits': 0,
-                'available_credits': monthly_credits,
-                'credits_reset_at': datetime.now().isoformat()
-            }).eq('id', credit['id']).execute()
-
-            reset_count += 1
+        # One SQL statement resets every row with a CASE over
+        # subscription_tier (see 004_reset_monthly_credits_rpc.sql)
+        # instead of a SELECT plus an UPDATE per user
+        result = supabase.rpc('reset_monthly_credits_bulk').execute()
 
         return {
             'status': 'success',
-            'reset_count': reset_count
+            'reset_count': result.data
         }
 
     except Exception as e:
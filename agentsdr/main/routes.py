@@ -1,8 +1,19 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
 from flask import render_template, redirect, url_for, flash, request, session
 from flask_login import login_required, current_user
 from agentsdr.main import main_bp
 from agentsdr.core.supabase_client import get_supabase, get_service_supabase
 from agentsdr.core.rbac import get_user_organizations
+from agentsdr.core.cache import (
+    all_agents_cache_key,
+    cache_get_json,
+    cache_set_json,
+    dashboard_cache_key,
+)
+
+logger = logging.getLogger(__name__)
 
 @main_bp.route('/')
 def index():
@@ -24,48 +35,62 @@ def dashboard():
             flash('Please log in to access the dashboard.', 'error')
             return redirect(url_for('auth.login'))
 
-        print(f"🔍 Dashboard: User {current_user.email} (ID: {current_user.id})")
+        logger.debug("Dashboard user %s (id=%s)", current_user.email, current_user.id)
 
         # Get Supabase client
         from agentsdr.core.supabase_client import get_service_supabase
         supabase = get_service_supabase()
 
-        # Get user's organization memberships
-        memberships_response = supabase.table('organization_members').select('org_id, role').eq('user_id', current_user.id).execute()
-        memberships = memberships_response.data or []
+        # Repeat page loads within the TTL render straight from Redis;
+        # membership mutations call invalidate_org_cache() to drop it
+        cache_key = dashboard_cache_key(current_user.id)
+        cached = cache_get_json(cache_key)
+        if cached is not None:
+            organizations = cached.get('organizations') or []
+            recent_records = cached.get('recent_records') or []
+        else:
+            # One RPC returns memberships, org details and recent records in
+            # a single round trip (see 007_get_dashboard_bundle.sql); fall
+            # back to composing the queries client-side if it's unavailable
+            try:
+                bundle = supabase.rpc('get_dashboard_bundle', {'uid': current_user.id}).execute()
+                data = bundle.data or {}
+                organizations = data.get('organizations') or []
+                recent_records = data.get('recent_records') or []
+            except Exception as rpc_error:
+                logger.warning("get_dashboard_bundle unavailable, composing queries: %s", rpc_error)
+
+                # Get user's organization memberships
+                memberships_response = supabase.table('organization_members').select('org_id, role').eq('user_id', current_user.id).execute()
+                memberships = memberships_response.data or []
 
-        print(f"🔍 Dashboard: Found {len(memberships)} memberships")
+                logger.debug("Dashboard: found %d memberships", len(memberships))
 
-        # Get organization details
-        for membership in memberships:
-            try:
-                org_id = membership['org_id']
-                role = membership['role']
+                # Get organization details with one IN query instead of a
+                # SELECT per membership
+                if memberships:
+                    org_ids = [m['org_id'] for m in memberships]
+                    role_by_id = {m['org_id']: m['role'] for m in memberships}
 
-                # Get organization details
-                org_response = supabase.table('organizations').select('*').eq('id', org_id).execute()
+                    # Only the fields the dashboard template reads
+                    orgs_response = supabase.table('organizations').select('id, name, slug').in_('id', org_ids).execute()
 
-                if org_response.data:
-                    org_data = org_response.data[0]
-                    organizations.append({
-                        'org': org_data,
-                        'role': role
-                    })
-                    print(f"✅ Added: {org_data['name']} (role: {role})")
-                else:
-                    print(f"⚠️ Organization not found: {org_id}")
+                    for org_data in orgs_response.data or []:
+                        organizations.append({
+                            'org': org_data,
+                            'role': role_by_id[org_data['id']]
+                        })
 
-            except Exception as org_error:
-                print(f"❌ Error processing org {membership}: {org_error}")
-                continue
+            cache_set_json(cache_key, {
+                'organizations': organizations,
+                'recent_records': recent_records
+            }, ttl=30)
 
-        print(f"🔍 Dashboard: Final count: {len(organizations)} organizations")
+        logger.debug("Dashboard: final count %d organizations", len(organizations))
 
     except Exception as e:
         error_message = str(e)
-        print(f"❌ Dashboard error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Dashboard error: %s", e)
         flash(f'Error loading dashboard: {error_message}', 'error')
 
     # Always return a response, even if there are errors
@@ -79,35 +104,38 @@ def dashboard():
 def org_dashboard(org_slug):
     try:
         supabase = get_supabase()
-        
-        # Get organization details
+
+        # The user-scoped client goes through RLS, and the organizations
+        # SELECT policy only returns rows for members and super admins
+        # (see schema.sql), so a non-member gets an empty result here -
+        # no separate membership query needed
         org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
         if not org_response.data:
-            flash('Organization not found.', 'error')
+            flash('Organization not found or access denied.', 'error')
             return redirect(url_for('main.dashboard'))
-        
+
         organization = org_response.data[0]
-        
-        # Check if user is a member
-        member_response = supabase.table('organization_members').select('*').eq('org_id', organization['id']).eq('user_id', current_user.id).execute()
-        if not member_response.data and not current_user.is_super_admin:
-            flash('Access denied.', 'error')
-            return redirect(url_for('main.dashboard'))
-        
-        # Get organization stats
-        records_count = supabase.table('records').select('id', count='exact').eq('org_id', organization['id']).execute()
-        members_count = supabase.table('organization_members').select('id', count='exact').eq('org_id', organization['id']).execute()
-        
-        # Get recent records
-        recent_records = supabase.table('records').select('*').eq('org_id', organization['id']).order('created_at', desc=True).limit(10).execute()
-        
-        # Get members
-        members_response = supabase.table('organization_members').select('user_id, role, joined_at').eq('org_id', organization['id']).execute()
+        org_id = organization['id']
+
+        # The recent records and member list are independent HTTP calls;
+        # run them concurrently so wall time tracks the slowest round
+        # trip instead of their sum. count='exact' returns totals on the
+        # list responses, replacing the separate stats queries, and the
+        # member list embeds users(email, display_name) so PostgREST
+        # joins server-side instead of one users SELECT per member.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            records_future = executor.submit(
+                lambda: supabase.table('records').select('*', count='exact').eq('org_id', org_id).order('created_at', desc=True).limit(10).execute()
+            )
+            members_future = executor.submit(
+                lambda: supabase.table('organization_members').select('user_id, role, joined_at, users(email, display_name)', count='exact').eq('org_id', org_id).execute()
+            )
+            recent_records = records_future.result()
+            members_response = members_future.result()
         members = []
         for member in members_response.data:
-            user_response = supabase.table('users').select('email, display_name').eq('id', member['user_id']).execute()
-            if user_response.data:
-                user_data = user_response.data[0]
+            user_data = member.get('users')
+            if user_data:
                 members.append({
                     'email': user_data['email'],
                     'display_name': user_data.get('display_name'),
@@ -117,8 +145,8 @@ def org_dashboard(org_slug):
         
         return render_template('main/org_dashboard.html',
                              organization=organization,
-                             records_count=records_count.count if records_count.count else 0,
-                             members_count=members_count.count if members_count.count else 0,
+                             records_count=recent_records.count if recent_records.count else 0,
+                             members_count=members_response.count if members_response.count else 0,
                              recent_records=recent_records.data,
                              members=members)
     
@@ -132,40 +160,52 @@ def org_dashboard(org_slug):
 def all_agents():
     """Show all agents across all organizations the user has access to"""
     try:
-        supabase = get_service_supabase()
-
-        # Get all organizations where user is a member
-        memberships = supabase.table('organization_members').select('org_id, role').eq('user_id', current_user.id).execute()
+        # Same short-TTL cache as the dashboard; dropped by
+        # invalidate_org_cache() on membership changes
+        cache_key = all_agents_cache_key(current_user.id)
+        cached = cache_get_json(cache_key)
+        if cached is not None:
+            return render_template('main/all_agents.html',
+                                   agents=cached.get('agents') or [],
+                                   organizations=cached.get('organizations') or {})
 
-        if not memberships.data and not current_user.is_super_admin:
-            flash('You are not a member of any organizations.', 'info')
-            return render_template('main/all_agents.html', agents=[], organizations={})
-
-        # Collect organization IDs
-        org_ids = [m['org_id'] for m in memberships.data] if memberships.data else []
+        supabase = get_service_supabase()
 
-        # If super admin, get all organizations
+        # Super admins see every organization anyway, so their membership
+        # rows add nothing - fetch the org list directly and skip the
+        # membership query (and the merge) entirely
         if current_user.is_super_admin:
             all_orgs = supabase.table('organizations').select('id').execute()
-            org_ids.extend([org['id'] for org in all_orgs.data if org['id'] not in org_ids])
+            org_ids = {org['id'] for org in all_orgs.data}
+        else:
+            memberships = supabase.table('organization_members').select('org_id').eq('user_id', current_user.id).execute()
+
+            if not memberships.data:
+                flash('You are not a member of any organizations.', 'info')
+                return render_template('main/all_agents.html', agents=[], organizations={})
+
+            org_ids = {m['org_id'] for m in memberships.data}
 
         # Get organization details
         organizations = {}
         if org_ids:
-            orgs_response = supabase.table('organizations').select('id, name, slug').in_('id', org_ids).execute()
-            for org in orgs_response.data:
-                organizations[org['id']] = org
+            orgs_response = supabase.table('organizations').select('id, name, slug').in_('id', list(org_ids)).execute()
+            organizations = {org['id']: org for org in orgs_response.data}
 
         # Get all agents from these organizations
         agents = []
         if org_ids:
-            agents_response = supabase.table('agents').select('*').in_('org_id', org_ids).order('created_at', desc=True).execute()
+            # Only the fields the listing template reads (org_id feeds
+            # the organization join below)
+            agents_response = supabase.table('agents').select('id, name, agent_type, created_at, org_id').in_('org_id', list(org_ids)).order('created_at', desc=True).execute()
             agents = agents_response.data or []
 
         # Add organization info to each agent
         for agent in agents:
             agent['organization'] = organizations.get(agent['org_id'], {'name': 'Unknown', 'slug': 'unknown'})
 
+        cache_set_json(cache_key, {'agents': agents, 'organizations': organizations}, ttl=30)
+
         return render_template('main/all_agents.html', agents=agents, organizations=organizations)
 
     except Exception as e:
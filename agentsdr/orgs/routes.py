@@ -1,16 +1,44 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify, current_app
+from flask import render_template, redirect, url_for, flash, request, jsonify, current_app, session
 from flask_login import login_required, current_user
 from agentsdr.orgs import orgs_bp
 from agentsdr.core.supabase_client import get_supabase, get_service_supabase
 from agentsdr.core.rbac import require_org_admin, require_org_member, is_org_admin
-from agentsdr.core.email import get_email_service
+from agentsdr.core.email_tasks import queue_invitation_email
+from agentsdr.core.http import http_session, DEFAULT_TIMEOUT
 from agentsdr.core.models import CreateOrganizationRequest, UpdateOrganizationRequest, CreateInvitationRequest
 from agentsdr.services.gmail_service import fetch_and_summarize_emails
+from agentsdr.auth.models import invalidate_org_cache
 
 from datetime import datetime, timedelta
+from urllib.parse import urlencode, quote
+import os
 import uuid
 import secrets
 
+# OAuth/API credentials are process-lifetime constants; read them once at
+# import instead of hitting the environment on every request
+_GMAIL_CLIENT_ID = os.getenv('GMAIL_CLIENT_ID')
+_GMAIL_CLIENT_SECRET = os.getenv('GMAIL_CLIENT_SECRET')
+_OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+# Gmail OAuth authorization URL - everything except `state` is constant per
+# (client_id, redirect_uri), so encode the static params once and reuse
+_gmail_auth_prefix_cache = {}
+
+def _gmail_auth_url(client_id: str, redirect_uri: str, state: str) -> str:
+    prefix = _gmail_auth_prefix_cache.get((client_id, redirect_uri))
+    if prefix is None:
+        prefix = 'https://accounts.google.com/o/oauth2/auth?' + urlencode({
+            'client_id': client_id,
+            'redirect_uri': redirect_uri,
+            'scope': 'https://www.googleapis.com/auth/gmail.readonly',
+            'response_type': 'code',
+            'access_type': 'offline',
+            'prompt': 'consent'
+        })
+        _gmail_auth_prefix_cache[(client_id, redirect_uri)] = prefix
+    return f"{prefix}&state={quote(state)}"
+
 @orgs_bp.route('/create', methods=['GET', 'POST'])
 @login_required
 def create_organization():
@@ -45,13 +73,14 @@ def create_organization():
                 return jsonify({'error': 'Organization slug already exists'}), 400
 
             # Create organization
+            now = datetime.utcnow().isoformat()
             org_data = {
                 'id': str(uuid.uuid4()),
                 'name': org_request.name,
                 'slug': org_request.slug,
                 'owner_user_id': current_user.id,
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat()
+                'created_at': now,
+                'updated_at': now
             }
 
             current_app.logger.info(f"Inserting organization data: {org_data}")
@@ -74,6 +103,7 @@ def create_organization():
 
                 if member_response.data:
                     current_app.logger.info("Organization member added successfully")
+                    invalidate_org_cache(current_user.id)
                     flash('Organization created successfully!', 'success')
                     return jsonify({
                         'success': True,
@@ -164,15 +194,17 @@ def manage_organization(org_slug):
             return redirect(url_for('main.dashboard'))
         organization = org_response.data[0]
 
-        # Counts and recent
-        members_count = supabase.table('organization_members').select('id', count='exact').eq('org_id', organization['id']).execute()
-        records_count = supabase.table('records').select('id', count='exact').eq('org_id', organization['id']).execute()
-        invites_count = supabase.table('invitations').select('id', count='exact').eq('org_id', organization['id']).execute()
+        # Counts and recent. Only .count is read on these, so limit(1)
+        # keeps the response body to one row; the exact total still
+        # arrives via the Content-Range header.
+        members_count = supabase.table('organization_members').select('id', count='exact').eq('org_id', organization['id']).limit(1).execute()
+        records_count = supabase.table('records').select('id', count='exact').eq('org_id', organization['id']).limit(1).execute()
+        invites_count = supabase.table('invitations').select('id', count='exact').eq('org_id', organization['id']).limit(1).execute()
 
         recent_records = supabase.table('records').select('*').eq('org_id', organization['id']).order('created_at', desc=True).limit(5).execute()
         # Agents count may fail if table not yet migrated
         try:
-            agents_count_resp = supabase.table('agents').select('id', count='exact').eq('org_id', organization['id']).execute()
+            agents_count_resp = supabase.table('agents').select('id', count='exact').eq('org_id', organization['id']).limit(1).execute()
             agents_count_val = agents_count_resp.count or 0
         except Exception:
             agents_count_val = 0
@@ -390,11 +422,8 @@ def view_agent(org_slug, agent_id):
 def gmail_auth(org_slug, agent_id):
     """Initiate Gmail OAuth flow"""
     try:
-        from urllib.parse import urlencode
-        import os
-
         # Gmail OAuth configuration
-        client_id = os.getenv('GMAIL_CLIENT_ID')
+        client_id = _GMAIL_CLIENT_ID
         if not client_id:
             flash('Gmail OAuth not configured. Please contact administrator.', 'error')
             return redirect(url_for('orgs.view_agent', org_slug=org_slug, agent_id=agent_id))
@@ -402,18 +431,13 @@ def gmail_auth(org_slug, agent_id):
         # OAuth parameters - use a fixed callback URL
         redirect_uri = url_for('orgs.gmail_callback_handler', _external=True)
         current_app.logger.info(f"Gmail OAuth redirect URI: {redirect_uri}")
-        params = {
-            'client_id': client_id,
-            'redirect_uri': redirect_uri,
-            'scope': 'https://www.googleapis.com/auth/gmail.readonly',
-            'response_type': 'code',
-            'access_type': 'offline',
-            'prompt': 'consent',
-            'state': f"{org_slug}:{agent_id}"
-        }
 
-        auth_url = f"https://accounts.google.com/o/oauth2/auth?{urlencode(params)}"
-        return redirect(auth_url)
+        # Use an opaque random state and keep the org/agent mapping server
+        # side, so the callback can't be replayed or forged (OAuth 2.0 §10.12)
+        state = secrets.token_urlsafe(16)
+        session[f'oauth_state:{state}'] = {'org_slug': org_slug, 'agent_id': agent_id}
+
+        return redirect(_gmail_auth_url(client_id, redirect_uri, state))
 
     except Exception as e:
         current_app.logger.error(f"Error initiating Gmail auth: {e}")
@@ -425,9 +449,6 @@ def gmail_auth(org_slug, agent_id):
 def gmail_callback(org_slug, agent_id):
     """Handle Gmail OAuth callback"""
     try:
-        import requests
-        import os
-
         code = request.args.get('code')
         state = request.args.get('state')
         error = request.args.get('error')
@@ -440,15 +461,15 @@ def gmail_callback(org_slug, agent_id):
             flash('No authorization code received.', 'error')
             return redirect(url_for('orgs.view_agent', org_slug=org_slug, agent_id=agent_id))
 
-        # Verify state parameter
-        expected_state = f"{org_slug}:{agent_id}"
-        if state != expected_state:
+        # Verify state parameter against the server-side entry set in gmail_auth
+        state_data = session.pop(f'oauth_state:{state}', None)
+        if not state_data or state_data.get('org_slug') != org_slug or state_data.get('agent_id') != agent_id:
             flash('Invalid state parameter.', 'error')
             return redirect(url_for('orgs.view_agent', org_slug=org_slug, agent_id=agent_id))
 
         # Exchange code for tokens
-        client_id = os.getenv('GMAIL_CLIENT_ID')
-        client_secret = os.getenv('GMAIL_CLIENT_SECRET')
+        client_id = _GMAIL_CLIENT_ID
+        client_secret = _GMAIL_CLIENT_SECRET
 
         redirect_uri = url_for('orgs.gmail_callback_handler', _external=True)
         current_app.logger.info(f"Token exchange redirect URI: {redirect_uri}")
@@ -460,7 +481,7 @@ def gmail_callback(org_slug, agent_id):
             'redirect_uri': redirect_uri
         }
 
-        token_response = requests.post('https://oauth2.googleapis.com/token', data=token_data)
+        token_response = http_session.post('https://oauth2.googleapis.com/token', data=token_data, timeout=DEFAULT_TIMEOUT)
         token_json = token_response.json()
 
         if 'error' in token_json:
@@ -469,15 +490,16 @@ def gmail_callback(org_slug, agent_id):
 
         # Store refresh token in agent config
         supabase = get_service_supabase()
+        now = datetime.utcnow().isoformat()
         config_update = {
             'gmail_refresh_token': token_json.get('refresh_token'),
             'gmail_access_token': token_json.get('access_token'),
-            'gmail_connected_at': datetime.utcnow().isoformat()
+            'gmail_connected_at': now
         }
 
         supabase.table('agents').update({
             'config': config_update,
-            'updated_at': datetime.utcnow().isoformat()
+            'updated_at': now
         }).eq('id', agent_id).execute()
 
         flash('Gmail connected successfully!', 'success')
@@ -492,9 +514,6 @@ def gmail_callback(org_slug, agent_id):
 def gmail_callback_handler():
     """Fixed Gmail OAuth callback handler"""
     try:
-        import requests
-        import os
-
         code = request.args.get('code')
         state = request.args.get('state')
         error = request.args.get('error')
@@ -507,16 +526,18 @@ def gmail_callback_handler():
             flash('Invalid OAuth response.', 'error')
             return redirect(url_for('main.dashboard'))
 
-        # Parse state to get org_slug and agent_id
-        try:
-            org_slug, agent_id = state.split(':', 1)
-        except ValueError:
+        # Resolve the opaque state back to org/agent from the session;
+        # pop so each state value is single-use
+        state_data = session.pop(f'oauth_state:{state}', None)
+        if not state_data:
             flash('Invalid state parameter.', 'error')
             return redirect(url_for('main.dashboard'))
+        org_slug = state_data['org_slug']
+        agent_id = state_data['agent_id']
 
         # Exchange code for tokens
-        client_id = os.getenv('GMAIL_CLIENT_ID')
-        client_secret = os.getenv('GMAIL_CLIENT_SECRET')
+        client_id = _GMAIL_CLIENT_ID
+        client_secret = _GMAIL_CLIENT_SECRET
 
         redirect_uri = url_for('orgs.gmail_callback_handler', _external=True)
         current_app.logger.info(f"Main callback redirect URI: {redirect_uri}")
@@ -528,7 +549,7 @@ def gmail_callback_handler():
             'redirect_uri': redirect_uri
         }
 
-        token_response = requests.post('https://oauth2.googleapis.com/token', data=token_data)
+        token_response = http_session.post('https://oauth2.googleapis.com/token', data=token_data, timeout=DEFAULT_TIMEOUT)
         token_json = token_response.json()
 
         if 'error' in token_json:
@@ -537,15 +558,16 @@ def gmail_callback_handler():
 
         # Store refresh token in agent config
         supabase = get_service_supabase()
+        now = datetime.utcnow().isoformat()
         config_update = {
             'gmail_refresh_token': token_json.get('refresh_token'),
             'gmail_access_token': token_json.get('access_token'),
-            'gmail_connected_at': datetime.utcnow().isoformat()
+            'gmail_connected_at': now
         }
 
         supabase.table('agents').update({
             'config': config_update,
-            'updated_at': datetime.utcnow().isoformat()
+            'updated_at': now
         }).eq('id', agent_id).execute()
 
         flash('Gmail connected successfully!', 'success')
@@ -649,19 +671,34 @@ def summarize_emails(org_slug, agent_id):
             return jsonify({'error': 'Gmail not connected'}), 400
 
         # Check required environment variables
-        import os
-        if not os.getenv('GMAIL_CLIENT_ID'):
+        if not _GMAIL_CLIENT_ID:
             return jsonify({'error': 'Gmail OAuth not configured (missing GMAIL_CLIENT_ID)'}), 500
-        if not os.getenv('GMAIL_CLIENT_SECRET'):
+        if not _GMAIL_CLIENT_SECRET:
             return jsonify({'error': 'Gmail OAuth not configured (missing GMAIL_CLIENT_SECRET)'}), 500
-        if not os.getenv('OPENAI_API_KEY'):
+        if not _OPENAI_API_KEY:
             return jsonify({'error': 'OpenAI API not configured. Please set the OPENAI_API_KEY environment variable.'}), 500
 
+        # Answer from the Redis cache when a recent background refresh (or a
+        # prior request) already summarized the same window
+        from agentsdr.core.cache import cache_get_json, cache_set_json, summaries_cache_key
+        cache_key = summaries_cache_key(agent_id, criteria_type, count)
+        cached = cache_get_json(cache_key)
+        if cached is not None:
+            current_app.logger.info(f"Returning {len(cached)} cached summaries for agent {agent_id}")
+            return jsonify({
+                'success': True,
+                'summaries': cached,
+                'criteria_type': criteria_type,
+                'count': len(cached)
+            })
+
         # Fetch and summarize emails
         try:
             current_app.logger.info(f"Starting email summarization for agent {agent_id}")
             summaries = fetch_and_summarize_emails(refresh_token, criteria_type, count)
-            
+            if summaries:
+                cache_set_json(cache_key, summaries, ttl=120)
+
             current_app.logger.info(f"Email summarization completed successfully with {len(summaries)} summaries")
 
             current_app.logger.info(f"Returning {len(summaries)} summaries directly")
@@ -927,6 +964,7 @@ def remove_member(org_slug, user_id):
 
         # Remove member
         supabase.table('organization_members').delete().eq('org_id', organization['id']).eq('user_id', user_id).execute()
+        invalidate_org_cache(user_id)
 
         flash('Member removed successfully.', 'success')
         return jsonify({'success': True})
@@ -955,6 +993,7 @@ def update_member_role(org_slug, user_id):
 
         # Update member role
         supabase.table('organization_members').update({'role': new_role}).eq('org_id', organization['id']).eq('user_id', user_id).execute()
+        invalidate_org_cache(user_id)
 
         flash('Member role updated successfully.', 'success')
         return jsonify({'success': True})
@@ -1029,8 +1068,8 @@ def create_invitation(org_slug):
         invitation_response = supabase.table('invitations').insert(invitation_data).execute()
 
         if invitation_response.data:
-            # Send invitation email
-            email_sent = get_email_service().send_invitation_email(
+            # Send invitation email off the request thread
+            email_sent = queue_invitation_email(
                 invite_request.email,
                 organization['name'],
                 invite_request.role,
@@ -1070,8 +1109,8 @@ def resend_invitation(org_slug, invitation_id):
 
         organization = org_response.data[0]
 
-        # Resend invitation email
-        email_sent = get_email_service().send_invitation_email(
+        # Resend invitation email off the request thread
+        email_sent = queue_invitation_email(
             invitation['email'],
             organization['name'],
             invitation['role'],
@@ -6,13 +6,16 @@ import base64
 import re
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-import requests
+import google_auth_httplib2
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 import openai
 from flask import current_app
 
+from agentsdr.core.http import http_session, DEFAULT_TIMEOUT
+
 
 class GmailService:
     def __init__(self):
@@ -32,7 +35,7 @@ class GmailService:
                 'grant_type': 'refresh_token'
             }
             
-            response = requests.post('https://oauth2.googleapis.com/token', data=token_data)
+            response = http_session.post('https://oauth2.googleapis.com/token', data=token_data, timeout=DEFAULT_TIMEOUT)
             current_app.logger.info(f"Token refresh response status: {response.status_code}")
             
             if response.status_code != 200:
@@ -76,7 +79,12 @@ class GmailService:
                 credentials.refresh(Request())
                 current_app.logger.info("Credentials refreshed successfully")
             
-            service = build('gmail', 'v1', credentials=credentials)
+            # Keepalive transport + no discovery file cache (see
+            # email/gmail_service.py for rationale)
+            http = google_auth_httplib2.AuthorizedHttp(
+                credentials, http=httplib2.Http(timeout=30)
+            )
+            service = build('gmail', 'v1', http=http, cache_discovery=False)
             current_app.logger.info("Gmail service built successfully")
             return service
             
@@ -264,11 +272,17 @@ class GmailService:
         try:
             current_app.logger.info(f"Parsing email {message.get('id', 'unknown')}")
             headers = message['payload'].get('headers', [])
-            
-            # Extract headers
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-            date_str = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+
+            # Extract headers in a single pass instead of one scan per field
+            sender, subject, date_str = 'Unknown', 'No Subject', ''
+            for header in headers:
+                name = header['name']
+                if name == 'From':
+                    sender = header['value']
+                elif name == 'Subject':
+                    subject = header['value']
+                elif name == 'Date':
+                    date_str = header['value']
             
             current_app.logger.info(f"Email headers - From: {sender}, Subject: {subject}")
             
@@ -284,12 +298,14 @@ class GmailService:
             body = self.extract_body(message['payload'])
             current_app.logger.info(f"Body length: {len(body)} characters")
             
-            # Clean sender name (remove email part if present)
-            sender_name = sender
-            if '<' in sender and '>' in sender:
-                sender_name = sender.split('<')[0].strip().strip('"')
-            elif '@' in sender:
-                sender_name = sender.split('@')[0]
+            # Clean sender name (remove email part if present);
+            # partition does the trisplit in one C-level scan
+            name_part, sep, _ = sender.partition('<')
+            if sep:
+                sender_name = name_part.strip().strip('"')
+            else:
+                name_part, sep, _ = sender.partition('@')
+                sender_name = name_part if sep else sender
             
             email_data = {
                 'id': message['id'],
@@ -15,6 +15,8 @@ class Config:
     SMTP_USER = os.environ.get('SMTP_USER')
     SMTP_PASS = os.environ.get('SMTP_PASS')
     SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'true').lower() == 'true'
+    SMTP_MAX_PER_SEC = int(os.environ.get('SMTP_MAX_PER_SEC', 30))
+    SMTP_MAX_PER_CONNECTION = int(os.environ.get('SMTP_MAX_PER_CONNECTION', 100))
     
     # Rate limiting
     RATELIMIT_DEFAULT = "200 per day;50 per hour"
@@ -24,6 +26,14 @@ class Config:
     SESSION_COOKIE_SECURE = os.environ.get('FLASK_ENV') == 'production'
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
+
+    # Server-side sessions (opt-in). With SESSION_TYPE=redis the Supabase
+    # OAuth tokens live in Redis keyed by session id instead of being
+    # shipped inside the signed cookie on every request.
+    SESSION_TYPE = os.environ.get('SESSION_TYPE')
+    SESSION_REDIS_URL = os.environ.get('SESSION_REDIS_URL') or os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    SESSION_USE_SIGNER = True
+    SESSION_PERMANENT = False
     
     # App settings
     INVITATION_EXPIRY_HOURS = 72
@@ -20,7 +20,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv()
 
 # Create Flask app context
-app = Flask(__name__)
+# Point at the app's template folder so email templates resolve here too
+app = Flask(__name__, template_folder='agentsdr/templates')
 app.config.from_object('config.Config')
 
 # Import after app creation
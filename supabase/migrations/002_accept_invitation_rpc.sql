@@ -0,0 +1,43 @@
+-- Accept an invitation in a single round-trip
+-- Version: 1.0
+-- Date: 2026-09-01
+
+-- Validates the token, adds the member and marks the invitation accepted in
+-- one transaction, returning the organization row. Replaces the sequential
+-- SELECT + INSERT + UPDATE issued from the app.
+CREATE OR REPLACE FUNCTION public.accept_invitation(p_token TEXT, p_user_id UUID)
+RETURNS public.organizations AS $$
+DECLARE
+    v_invitation public.invitations%ROWTYPE;
+    v_org public.organizations%ROWTYPE;
+BEGIN
+    SELECT * INTO v_invitation
+    FROM public.invitations
+    WHERE token = p_token
+      AND accepted_at IS NULL
+      AND expires_at > NOW()
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Invalid or expired invitation';
+    END IF;
+
+    SELECT * INTO v_org
+    FROM public.organizations
+    WHERE id = v_invitation.org_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Organization not found';
+    END IF;
+
+    INSERT INTO public.organization_members (org_id, user_id, role, joined_at)
+    VALUES (v_invitation.org_id, p_user_id, v_invitation.role, NOW())
+    ON CONFLICT (org_id, user_id) DO NOTHING;
+
+    UPDATE public.invitations
+    SET accepted_at = NOW()
+    WHERE id = v_invitation.id;
+
+    RETURN v_org;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
@@ -0,0 +1,9 @@
+-- Lock down execution of accept_invitation
+-- Version: 1.0
+-- Date: 2026-09-01
+
+-- The function runs SECURITY DEFINER, so restrict who may call it to the
+-- roles the app actually uses instead of the default PUBLIC grant.
+REVOKE ALL ON FUNCTION public.accept_invitation(TEXT, UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.accept_invitation(TEXT, UUID) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.accept_invitation(TEXT, UUID) TO service_role;
@@ -0,0 +1,36 @@
+-- Reset every user's monthly credits in one statement
+-- Version: 1.0
+-- Date: 2026-09-01
+
+-- One UPDATE with a CASE over subscription_tier replaces the app-side
+-- loop that issued a round trip per user_credits row. Tier allowances
+-- mirror TIER_LIMITS in agentsdr/email/models.py.
+CREATE OR REPLACE FUNCTION public.reset_monthly_credits_bulk()
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE public.user_credits
+    SET total_credits = tier_credits.amount,
+        used_credits = 0,
+        available_credits = tier_credits.amount,
+        credits_reset_at = NOW()
+    FROM (
+        SELECT id,
+               CASE subscription_tier
+                   WHEN 'pro' THEN 5000
+                   WHEN 'business' THEN 30000
+                   ELSE 400
+               END AS amount
+        FROM public.user_credits
+    ) AS tier_credits
+    WHERE public.user_credits.id = tier_credits.id;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- SECURITY DEFINER: only the backend may trigger a global reset
+REVOKE ALL ON FUNCTION public.reset_monthly_credits_bulk() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.reset_monthly_credits_bulk() TO service_role;
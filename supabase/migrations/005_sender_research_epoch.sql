@@ -0,0 +1,17 @@
+-- Epoch column for the sender-research freshness check
+-- Version: 1.0
+-- Date: 2026-09-01
+
+-- Integer comparison replaces parsing last_researched_at from an ISO
+-- string on every research task, and the index lets the freshness
+-- filter run server-side so stale rows never cross the wire.
+ALTER TABLE public.sender_research
+    ADD COLUMN IF NOT EXISTS last_researched_at_epoch BIGINT;
+
+UPDATE public.sender_research
+SET last_researched_at_epoch = EXTRACT(EPOCH FROM last_researched_at)::BIGINT
+WHERE last_researched_at_epoch IS NULL
+  AND last_researched_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_sender_research_epoch
+    ON public.sender_research(last_researched_at_epoch);
@@ -0,0 +1,32 @@
+-- Settle many credit deductions in one round trip
+-- Version: 1.0
+-- Date: 2026-09-01
+
+-- Parallel arrays instead of one RPC per classification/draft/research;
+-- the flush_credits beat task accumulates deductions in Redis and
+-- settles them here in a single call.
+CREATE OR REPLACE FUNCTION public.deduct_credits_bulk(
+    p_user_ids UUID[],
+    p_org_ids UUID[],
+    p_credits INTEGER[],
+    p_action_types TEXT[],
+    p_descriptions TEXT[]
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_settled INTEGER := 0;
+    i INTEGER;
+BEGIN
+    FOR i IN 1..COALESCE(array_length(p_user_ids, 1), 0) LOOP
+        IF deduct_credits(p_user_ids[i], p_org_ids[i], p_credits[i],
+                          p_action_types[i], p_descriptions[i]) THEN
+            v_settled := v_settled + 1;
+        END IF;
+    END LOOP;
+    RETURN v_settled;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- SECURITY DEFINER: settlement is backend-only
+REVOKE ALL ON FUNCTION public.deduct_credits_bulk(UUID[], UUID[], INTEGER[], TEXT[], TEXT[]) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.deduct_credits_bulk(UUID[], UUID[], INTEGER[], TEXT[], TEXT[]) TO service_role;
@@ -0,0 +1,39 @@
+-- Dashboard state in a single round trip
+-- Version: 1.0
+-- Date: 2026-09-01
+
+-- Replaces the memberships + organizations queries (and the recent
+-- records fetch) the dashboard view composed client-side; the JOINs run
+-- on the member/org indexes and the app unpacks one JSONB payload.
+CREATE OR REPLACE FUNCTION public.get_dashboard_bundle(uid UUID)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'organizations', COALESCE((
+            SELECT jsonb_agg(
+                jsonb_build_object('org', to_jsonb(o), 'role', m.role)
+                ORDER BY o.name
+            )
+            FROM public.organization_members m
+            JOIN public.organizations o ON o.id = m.org_id
+            WHERE m.user_id = uid
+        ), '[]'::jsonb),
+        'recent_records', COALESCE((
+            SELECT jsonb_agg(to_jsonb(recent))
+            FROM (
+                SELECT r.*
+                FROM public.records r
+                JOIN public.organization_members m ON m.org_id = r.org_id
+                WHERE m.user_id = uid
+                ORDER BY r.created_at DESC
+                LIMIT 10
+            ) AS recent
+        ), '[]'::jsonb)
+    );
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+-- SECURITY DEFINER with a caller-supplied uid bypasses RLS, so only the
+-- service role may execute it - an authenticated grant would let any
+-- logged-in user read another user's memberships and records. The app
+-- only calls it through the service client.
+REVOKE ALL ON FUNCTION public.get_dashboard_bundle(UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_dashboard_bundle(UUID) TO service_role;
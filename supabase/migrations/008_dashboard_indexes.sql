@@ -0,0 +1,21 @@
+-- Covering/composite indexes for the dashboard hot paths
+-- Version: 1.0
+-- Date: 2026-09-01
+
+-- The membership lookup reads org_id and role after filtering on
+-- user_id; INCLUDE makes it an index-only scan. The recent-records and
+-- agents listings filter on org_id and order by created_at DESC LIMIT n,
+-- which the composite indexes satisfy without a sort.
+-- Plain CREATE INDEX: migrations here are applied transactionally
+-- (supabase db push) and CONCURRENTLY cannot run inside a transaction
+-- block. The build takes a write lock for its duration; on a table
+-- large enough for that to matter, run the CONCURRENTLY form by hand
+-- outside the migration instead.
+CREATE INDEX IF NOT EXISTS idx_org_members_user_covering
+    ON public.organization_members(user_id) INCLUDE (org_id, role);
+
+CREATE INDEX IF NOT EXISTS idx_records_org_created
+    ON public.records(org_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_agents_org_created
+    ON public.agents(org_id, created_at DESC);